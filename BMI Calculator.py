@@ -1,20 +1,1207 @@
 import tkinter as tk
 from tkinter import messagebox, ttk
+import argparse
+import csv
 import json
-from datetime import datetime
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import numpy as np
+import logging
+import math
+import os
+import queue
+import shutil
+import sys
+import time
+import zlib
+from itertools import islice
+from bisect import bisect_right
+from contextlib import contextmanager
+import sqlite3
+import threading
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+from datetime import date, datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+# NumPy and matplotlib are only needed for charts, bulk import and the batch
+# API. They are imported on first use by import_numpy()/import_charting(), and
+# the GUI warms them on a background thread once the main window is up, so
+# they never delay the first frame.
+np = None
+matplotlib = mdates = Figure = FigureCanvasTkAgg = NavigationToolbar2Tk = None
+_charting_lock = threading.Lock()
+WARMUP_DELAY_MS = 200     # Delay after the first frame before warming charting imports
+LOAD_POLL_MS = 50         # How often the Tk loop checks on a background history load
 
 DATA_FILE = "bmi_data.json"
+HISTORY_LOG_FILE = "bmi_data.jsonl"
+HISTORY_DB_FILE = "bmi_data.db"
+SHARD_DIRECTORY = "bmi_shards"
+SHARD_COUNT = 64
+COLUMNAR_DIRECTORY = "bmi_columns"
+# SQLite's WAL mode does not work over a network filesystem; kiosks sharing
+# data files on a network volume should use "jsonl" (--backend or this variable)
+STORAGE_BACKEND = os.environ.get("BMI_STORAGE_BACKEND", "sqlite")
+FLUSH_INTERVAL = 2.0      # Seconds between background flushes
+FLUSH_BATCH_SIZE = 256    # Pending records that trigger an early flush
+IMPORT_BATCH_SIZE = 50000 # Rows per vectorised chunk / transaction in bulk imports
+
+# Static gauge geometry, computed once rather than on every result
+GAUGE_CENTER = (150, 140)
+GAUGE_RADIUS = 100
+GAUGE_INNER_RADIUS = 60
+GAUGE_NEEDLE_LENGTH = 70
+# (start angle, extent, color key) per BMI range, left to right
+GAUGE_SECTIONS = [
+    (180 - start_ratio * 180, -(end_ratio - start_ratio) * 180, color_key)
+    for start_ratio, end_ratio, color_key in [
+        (0, 0.25, 'underweight'),    # Underweight (0-18.5)
+        (0.25, 0.5, 'normal'),       # Normal (18.5-25)
+        (0.5, 0.75, 'overweight'),   # Overweight (25-30)
+        (0.75, 1.0, 'obese')         # Obese (30+)
+    ]
+]
+# (text, x, y) for the range labels just outside the arc
+GAUGE_LABELS = [
+    (label,
+     GAUGE_CENTER[0] + (GAUGE_RADIUS + 20) * math.cos(math.radians(180 - angle)),
+     GAUGE_CENTER[1] - (GAUGE_RADIUS + 20) * math.sin(math.radians(180 - angle)))
+    for label, angle in [("18.5", 45), ("25", 90), ("30", 135), ("40+", 165)]
+]
+
+# Category boundaries shared by the scalar and batch classifiers; a BMI equal
+# to a threshold belongs to the higher category
+BMI_THRESHOLDS = (18.5, 25, 30)
+BMI_CATEGORIES = ("Underweight", "Normal Weight", "Overweight", "Obese")
+BMI_COLOR_KEYS = ("underweight", "normal", "overweight", "obese")
+
+
+def import_numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
+
+
+def import_charting():
+    global matplotlib, mdates, Figure, FigureCanvasTkAgg, NavigationToolbar2Tk
+    with _charting_lock:
+        if NavigationToolbar2Tk is None:
+            import_numpy()
+            import matplotlib.style
+            import matplotlib.dates
+            from matplotlib.figure import Figure as figure_class
+            from matplotlib.backends import backend_tkagg
+            mdates = matplotlib.dates
+            Figure = figure_class
+            FigureCanvasTkAgg = backend_tkagg.FigureCanvasTkAgg
+            NavigationToolbar2Tk = backend_tkagg.NavigationToolbar2Tk
+
+
+def calculate_bmi_batch(weights, heights):
+    import_numpy()
+    weights = np.asarray(weights, dtype=np.float64)
+    heights = np.asarray(heights, dtype=np.float64)
+    return weights / (heights * heights)
+
+
+def classify_bmi_batch(bmis):
+    """Return category codes (indices into BMI_CATEGORIES) for an array of BMIs."""
+    import_numpy()
+    return np.digitize(np.asarray(bmis, dtype=np.float64), BMI_THRESHOLDS).astype(np.int8)
+
+
+# Rollup buckets are keyed by the "%Y-%m-%d" date the bucket starts on
+# (weeks start on Monday)
+ROLLUP_PERIODS = ("day", "week", "month")
+
+
+def rollup_bucket(entry_date, period):
+    day = entry_date[:10]
+    if period == "day":
+        return day
+    if period == "month":
+        return day[:8] + "01"
+    start = date.fromisoformat(day)
+    return (start - timedelta(days=start.weekday())).isoformat()
+
+
+def add_to_rollup(buckets, key, bmi, weight):
+    """Merge one entry into a {key: stats} dict.
+
+    stats is [count, bmi_sum, bmi_min, bmi_max, weight_sum, weight_min, weight_max].
+    """
+    stats = buckets.get(key)
+    if stats is None:
+        buckets[key] = [1, bmi, bmi, bmi, weight, weight, weight]
+    else:
+        stats[0] += 1
+        stats[1] += bmi
+        stats[2] = min(stats[2], bmi)
+        stats[3] = max(stats[3], bmi)
+        stats[4] += weight
+        stats[5] = min(stats[5], weight)
+        stats[6] = max(stats[6], weight)
+
+
+def rollup_rows(buckets):
+    return [
+        {"bucket": key, "count": count,
+         "bmi_mean": bmi_sum / count, "bmi_min": bmi_min, "bmi_max": bmi_max,
+         "weight_mean": weight_sum / count, "weight_min": weight_min, "weight_max": weight_max}
+        for key, (count, bmi_sum, bmi_min, bmi_max, weight_sum, weight_min, weight_max)
+        in sorted(buckets.items())
+    ]
+
+
+def compute_rollup_buckets(entries, period):
+    buckets = {}
+    for entry in entries:
+        add_to_rollup(buckets, rollup_bucket(entry["date"], period), entry["bmi"], entry["weight"])
+    return buckets
+
+
+def entries_to_arrays(entries):
+    """Return (timestamps, weights, heights, bmis) arrays for history entries.
+
+    Timestamps are int64 seconds since 1970-01-01 of the entry's wall-clock
+    date; entry dates are naive local times and are kept that way.
+    """
+    import_numpy()
+    return (
+        np.array([e["date"] for e in entries], dtype="datetime64[s]").astype(np.int64),
+        np.array([e["weight"] for e in entries], dtype=np.float64),
+        np.array([e["height"] for e in entries], dtype=np.float64),
+        np.array([e["bmi"] for e in entries], dtype=np.float64),
+    )
+
+
+@contextmanager
+def locked_file(path, shared=False):
+    """Hold an advisory lock on ``path`` (created if missing) across processes.
+
+    Shared locks fall back to exclusive ones on Windows, where msvcrt only
+    offers exclusive byte-range locks.
+    """
+    with open(path, "a+b") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue  # LK_LOCK gives up after ~10s; keep waiting
+        try:
+            yield
+        finally:
+            if fcntl is None:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            # flock locks are released when the file is closed
+
+
+class JSONLinesStore:
+    """Append-only BMI history.
+
+    Each save appends a single JSON line to ``log_path``. The log is
+    periodically folded into ``snapshot_path``, which keeps the original
+    ``DATA_FILE`` layout ({user: [entries]}), so an existing data file is
+    picked up as the initial snapshot without any conversion step.
+
+    Several processes (e.g. kiosks on a shared volume) may use the same files.
+    Appends and compaction hold an exclusive lock on ``<log_path>.lock`` and
+    reads a shared one, so no save is lost to a concurrent compaction and a
+    reader never sees a half-compacted state. The snapshot is replaced by
+    atomic rename, and the log doubles as the journal until then.
+
+    Each compacted log restarts with a generation header, and the snapshot
+    records under ``FOLDED_KEY`` which log generation it folded up to which
+    byte offset. A crash between writing the snapshot and resetting the log
+    therefore replays only the entries appended after that offset instead
+    of duplicating the whole log.
+    """
+
+    FOLDED_KEY = "__folded_log__"
+
+    def __init__(self, snapshot_path=DATA_FILE, log_path=HISTORY_LOG_FILE, compact_min_bytes=64 * 1024):
+        self.snapshot_path = snapshot_path
+        self.log_path = log_path
+        self.lock_path = log_path + ".lock"
+        self.compact_min_bytes = compact_min_bytes
+
+    def append(self, user, entry):
+        self.append_many([(user, entry)])
+
+    def append_many(self, records):
+        lines = "".join(json.dumps({"user": user, **entry}) + "\n" for user, entry in records)
+        with locked_file(self.lock_path):
+            with open(self.log_path, "a+b") as file:
+                # Terminate a line torn by a crashed writer so it cannot swallow ours
+                if file.seek(0, os.SEEK_END):
+                    file.seek(-1, os.SEEK_END)
+                    if file.read(1) != b"\n":
+                        lines = "\n" + lines
+                else:
+                    lines = self._log_header() + lines
+                file.write(lines.encode("utf-8"))
+
+            # Compact once the log outgrows the snapshot, so the rewrite cost is
+            # amortised over as many appends as the snapshot already holds
+            if self._needs_compaction():
+                self._compact_locked()
+
+    def history(self, user):
+        return self.load_all().get(user, [])
+
+    def rollups(self, user, period):
+        return rollup_rows(self.rollup_buckets(user, period))
+
+    def rollup_buckets(self, user, period):
+        return compute_rollup_buckets(self.history(user), period)
+
+    def history_arrays(self, user):
+        return entries_to_arrays(self.history(user))
+
+    def load_all(self):
+        with locked_file(self.lock_path, shared=True):
+            return self._load_locked()[0]
+
+    def compact(self):
+        with locked_file(self.lock_path):
+            self._compact_locked()
+
+    def migrate(self, legacy_path):
+        """Fold a legacy {user: [entries]} file into this store."""
+        with open(legacy_path, "r") as file:
+            legacy = json.load(file)
+        legacy.pop(self.FOLDED_KEY, None)
+        self.append_many((user, entry) for user, entries in legacy.items() for entry in entries)
+        self.compact()
+
+    def _needs_compaction(self):
+        return self._size(self.log_path) > max(self._size(self.snapshot_path), self.compact_min_bytes)
+
+    def _compact_locked(self):
+        data, generation, offset = self._load_locked()
+        data[self.FOLDED_KEY] = {"generation": generation, "offset": offset}
+        self._replace(self.snapshot_path, json.dumps(data, indent=4))
+        # A crash before this point leaves the old log, whose first
+        # ``offset`` bytes the snapshot now says to skip
+        self._replace(self.log_path, self._log_header())
+
+    def close(self):
+        pass
+
+    @staticmethod
+    def _replace(path, text):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as file:
+            file.write(text)
+        os.replace(tmp_path, path)
+
+    def _load_locked(self):
+        """Return (data, log generation, log size) with the unfolded part of the log replayed"""
+        data = self._load_snapshot()
+        folded = data.pop(self.FOLDED_KEY, None) or {}
+        try:
+            file = open(self.log_path, "rb")
+        except FileNotFoundError:
+            return data, None, 0
+        with file:
+            generation = self._read_generation(file)
+            if folded and folded["generation"] == generation:
+                file.seek(max(file.tell(), folded["offset"]))
+            for line in file:
+                try:
+                    record = json.loads(line)
+                    user = record.pop("user")
+                except (json.JSONDecodeError, KeyError):
+                    continue  # Torn write from an interrupted save
+                data.setdefault(user, []).append(record)
+            return data, generation, file.tell()
+
+    @staticmethod
+    def _log_header():
+        # A fresh token rather than a counter, so a log deleted and recreated
+        # by hand can never match an older snapshot's marker
+        return json.dumps({"log_generation": os.urandom(8).hex()}) + "\n"
+
+    @staticmethod
+    def _read_generation(file):
+        # Logs from before generations were recorded have no header
+        try:
+            header = json.loads(file.readline())
+        except json.JSONDecodeError:
+            header = None
+        if isinstance(header, dict) and "log_generation" in header:
+            return header["log_generation"]
+        file.seek(0)
+        return None
+
+    def _load_snapshot(self):
+        try:
+            with open(self.snapshot_path, "r") as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    @staticmethod
+    def _size(path):
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+
+class SQLiteStore:
+    """BMI history in a local SQLite database indexed on (user, date).
+
+    On first run the legacy ``DATA_FILE`` and its ``HISTORY_LOG_FILE`` are
+    imported, after which saves and per-user reads only touch the index
+    range for that user.
+    """
+
+    SCHEMA_VERSION = 2
+
+    # SQL equivalents of rollup_bucket(), used to backfill existing history
+    ROLLUP_BUCKET_SQL = {
+        "day": "substr(date, 1, 10)",
+        "week": "date(substr(date, 1, 10), 'weekday 0', '-6 days')",
+        "month": "substr(date, 1, 8) || '01'",
+    }
+
+    def __init__(self, db_path=HISTORY_DB_FILE, legacy_path=DATA_FILE, legacy_log_path=HISTORY_LOG_FILE):
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        if self._schema_version() < self.SCHEMA_VERSION:
+            self._migrate(legacy_path, legacy_log_path)
+
+    def _schema_version(self):
+        return self.conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def _migrate(self, legacy_path, legacy_log_path):
+        with self.conn:
+            # Take the write lock before deciding anything: another process
+            # opening the same fresh database may have migrated it meanwhile
+            self.conn.execute("BEGIN IMMEDIATE")
+            version = self._schema_version()
+            if version < self.SCHEMA_VERSION:
+                self._create_schema(version, legacy_path, legacy_log_path)
+
+    def _create_schema(self, version, legacy_path, legacy_log_path):
+        # Runs inside _migrate's transaction
+        if version < 1:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS history ("
+                "id INTEGER PRIMARY KEY, user TEXT NOT NULL, date TEXT NOT NULL, "
+                "weight REAL NOT NULL, height REAL NOT NULL, bmi REAL NOT NULL)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS history_user_date ON history (user, date)"
+            )
+            if legacy_path and (os.path.exists(legacy_path) or os.path.exists(legacy_log_path)):
+                # Read through JSONLinesStore so saves still sitting in
+                # the uncompacted log are imported too
+                legacy = JSONLinesStore(legacy_path, legacy_log_path).load_all()
+                self.conn.executemany(
+                    "INSERT INTO history (user, date, weight, height, bmi) VALUES (?, ?, ?, ?, ?)",
+                    ((user, e["date"], e["weight"], e["height"], e["bmi"])
+                     for user, entries in legacy.items() for e in entries)
+                )
+
+        if version < 2:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS rollups ("
+                "user TEXT NOT NULL, period TEXT NOT NULL, bucket TEXT NOT NULL, "
+                "count INTEGER NOT NULL, bmi_sum REAL NOT NULL, bmi_min REAL NOT NULL, "
+                "bmi_max REAL NOT NULL, weight_sum REAL NOT NULL, weight_min REAL NOT NULL, "
+                "weight_max REAL NOT NULL, PRIMARY KEY (user, period, bucket)) WITHOUT ROWID"
+            )
+            for period, bucket_sql in self.ROLLUP_BUCKET_SQL.items():
+                self.conn.execute(
+                    f"INSERT INTO rollups SELECT user, ?, {bucket_sql} AS bucket, count(*), "
+                    "sum(bmi), min(bmi), max(bmi), sum(weight), min(weight), max(weight) "
+                    "FROM history GROUP BY user, bucket",
+                    (period,)
+                )
+
+        self.conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+
+    def append(self, user, entry):
+        self.append_many([(user, entry)])
+
+    def append_many(self, records):
+        records = list(records)
+
+        # Aggregate the batch first so each touched bucket is upserted once
+        buckets = {}
+        for user, e in records:
+            for period in ROLLUP_PERIODS:
+                add_to_rollup(buckets, (user, period, rollup_bucket(e["date"], period)), e["bmi"], e["weight"])
+
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO history (user, date, weight, height, bmi) VALUES (?, ?, ?, ?, ?)",
+                ((user, e["date"], e["weight"], e["height"], e["bmi"]) for user, e in records)
+            )
+            self.conn.executemany(
+                "INSERT INTO rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (user, period, bucket) DO UPDATE SET "
+                "count = count + excluded.count, "
+                "bmi_sum = bmi_sum + excluded.bmi_sum, "
+                "bmi_min = min(bmi_min, excluded.bmi_min), "
+                "bmi_max = max(bmi_max, excluded.bmi_max), "
+                "weight_sum = weight_sum + excluded.weight_sum, "
+                "weight_min = min(weight_min, excluded.weight_min), "
+                "weight_max = max(weight_max, excluded.weight_max)",
+                (key + tuple(stats) for key, stats in buckets.items())
+            )
+
+    def history(self, user):
+        rows = self.conn.execute(
+            "SELECT date, weight, height, bmi FROM history WHERE user = ? ORDER BY date, id",
+            (user,)
+        )
+        return [{"date": d, "weight": w, "height": h, "bmi": b} for d, w, h, b in rows]
+
+    def history_arrays(self, user):
+        return entries_to_arrays(self.history(user))
+
+    def rollups(self, user, period):
+        return rollup_rows(self.rollup_buckets(user, period))
+
+    def rollup_buckets(self, user, period):
+        rows = self.conn.execute(
+            "SELECT bucket, count, bmi_sum, bmi_min, bmi_max, weight_sum, weight_min, weight_max "
+            "FROM rollups WHERE user = ? AND period = ?",
+            (user, period)
+        )
+        return {key: list(stats) for key, *stats in rows}
+
+    def close(self):
+        self.conn.close()
+
+
+class CachedStore:
+    """Write-behind cache in front of another store.
+
+    Reads are served from memory once a user's history has been loaded, and
+    appends only queue the record; a background thread hands queued records
+    to the backend in batches. ``close()`` must be called to flush the tail.
+    """
+
+    def __init__(self, backend, flush_interval=FLUSH_INTERVAL, batch_size=FLUSH_BATCH_SIZE):
+        self.backend = backend
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._cache = {}
+        self._rollups = {}  # (user, period) -> {bucket: stats}
+        self._pending = []
+        self._lock = threading.Lock()          # Guards _cache, _rollups and _pending
+        self._backend_lock = threading.Lock()  # Serialises backend access
+        self._wake = threading.Event()
+        self._stopping = False  # Tells the writer thread to exit
+        self._closed = False    # Set only once the final flush has succeeded
+        self._writer = threading.Thread(target=self._run_writer, name="bmi-writer", daemon=True)
+        self._writer.start()
+
+    def append(self, user, entry):
+        with self._lock:
+            if user in self._cache:
+                self._cache[user].append(entry)
+            for period in ROLLUP_PERIODS:
+                buckets = self._rollups.get((user, period))
+                if buckets is not None:
+                    add_to_rollup(buckets, rollup_bucket(entry["date"], period), entry["bmi"], entry["weight"])
+            self._pending.append((user, entry))
+            if len(self._pending) >= self.batch_size:
+                self._wake.set()
+
+    def append_many(self, records):
+        for user, entry in records:
+            self.append(user, entry)
+
+    def history(self, user):
+        with self._lock:
+            if user in self._cache:
+                return list(self._cache[user])
+
+        # Cache miss: hand everything queued so far to the backend, then load.
+        # The writer cannot run in between, so records appended meanwhile are
+        # still pending and get merged in below.
+        with self._backend_lock:
+            self._flush_pending()
+            entries = self.backend.history(user)
+            with self._lock:
+                entries.extend(e for u, e in self._pending if u == user)
+                self._cache[user] = entries
+                return list(entries)
+
+    def history_arrays(self, user):
+        with self._lock:
+            if user in self._cache:
+                return entries_to_arrays(self._cache[user])
+
+        if not isinstance(self.backend, ColumnarStore):
+            # Row backends build entry dicts anyway, so fill the cache and
+            # serve repeat opens from memory
+            return entries_to_arrays(self.history(user))
+
+        # Columnar backends answer this without building entry dicts, so
+        # misses go straight to the backend rather than filling the cache
+        with self._backend_lock:
+            self._flush_pending()
+            arrays = self.backend.history_arrays(user)
+            with self._lock:
+                pending = [e for u, e in self._pending if u == user]
+        if not pending:
+            return arrays
+        return tuple(np.concatenate(pair) for pair in zip(arrays, entries_to_arrays(pending)))
+
+    def rollups(self, user, period):
+        key = (user, period)
+        with self._lock:
+            if key in self._rollups:
+                return rollup_rows(self._rollups[key])
+
+        # Same miss handling as history(): flush, load, then merge what is
+        # still pending
+        with self._backend_lock:
+            self._flush_pending()
+            buckets = self.backend.rollup_buckets(user, period)
+            with self._lock:
+                for u, e in self._pending:
+                    if u == user:
+                        add_to_rollup(buckets, rollup_bucket(e["date"], period), e["bmi"], e["weight"])
+                self._rollups[key] = buckets
+                return rollup_rows(buckets)
+
+    def flush(self):
+        with self._backend_lock:
+            self._flush_pending()
+
+    def _flush_pending(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return
+        try:
+            self.backend.append_many(batch)
+        except Exception:
+            # Put the batch back ahead of anything appended meanwhile, so a
+            # transient failure (e.g. another process holding the database
+            # lock) delays the records instead of losing them
+            with self._lock:
+                self._pending[:0] = batch
+            raise
+
+    def close(self):
+        """Stop the writer, flush what is pending and close the backend.
+
+        If the final flush fails the error is raised and the store stays
+        open with the records still pending, so close() can be retried, or
+        discard_pending() called to give them up.
+        """
+        if self._closed:
+            return
+        self._stopping = True
+        self._wake.set()
+        self._writer.join()
+        self.flush()
+        self._closed = True
+        self.backend.close()
+
+    def discard_pending(self):
+        """Drop the records not yet written and return how many there were"""
+        with self._lock:
+            dropped = len(self._pending)
+            self._pending.clear()
+        return dropped
+
+    def _run_writer(self):
+        while not self._stopping:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if self._stopping:
+                break  # close() does the final flush itself
+            try:
+                self.flush()
+            except Exception:
+                # Keep the writer alive; the batch is still pending and is
+                # retried on the next interval
+                logger.exception("Flushing BMI history failed; retrying in %.1fs", self.flush_interval)
+
+
+class ShardedStore:
+    """BMI history split across per-bucket JSON-lines stores.
+
+    Users are hashed into ``shard_count`` buckets, and each bucket is its own
+    JSONLinesStore, with the same locking and compaction. ``index.json`` records
+    which shard each user lives in, so saves and history reads for a user open
+    only that shard. The index also lets rebalance() move users to a
+    different shard count.
+    """
+
+    INDEX_FILE = "index.json"
+
+    def __init__(self, directory=SHARD_DIRECTORY, shard_count=SHARD_COUNT):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.index_path = os.path.join(directory, self.INDEX_FILE)
+        self.index_lock_path = self.index_path + ".lock"
+        self._shards = {}
+        self.shard_count, self.users = shard_count, {}
+        self._load_index()
+
+    def append(self, user, entry):
+        self.append_many([(user, entry)])
+
+    def append_many(self, records):
+        records = list(records)
+        self._assign_shards({user for user, _ in records})
+        by_shard = {}
+        for user, entry in records:
+            by_shard.setdefault(self.users[user], []).append((user, entry))
+        for shard, shard_records in by_shard.items():
+            self._shard(shard).append_many(shard_records)
+
+    def history(self, user):
+        shard = self._shard_for(user)
+        return [] if shard is None else self._shard(shard).history(user)
+
+    def rollups(self, user, period):
+        return rollup_rows(self.rollup_buckets(user, period))
+
+    def rollup_buckets(self, user, period):
+        return compute_rollup_buckets(self.history(user), period)
+
+    def history_arrays(self, user):
+        return entries_to_arrays(self.history(user))
+
+    def load_all(self):
+        data = {}
+        for shard in sorted(set(self.users.values())):
+            data.update(self._shard(shard).load_all())
+        return data
+
+    def close(self):
+        pass
+
+    def rebalance(self, shard_count):
+        """Redistribute every user over ``shard_count`` shards.
+
+        Meant to run while no other process is writing to the store.
+        """
+        data = self.load_all()
+        old_files = [
+            path for shard in set(self.users.values())
+            for path in (self._shard(shard).snapshot_path, self._shard(shard).log_path,
+                         self._shard(shard).lock_path)
+        ]
+        staging = self.directory + ".rebalance"
+        shutil.rmtree(staging, ignore_errors=True)  # Leftovers from an interrupted run
+        target = ShardedStore(staging, shard_count)
+        # One append_many call, so the index is written once rather than per user
+        target.append_many((user, entry) for user, entries in data.items() for entry in entries)
+        for shard in set(target.users.values()):
+            target._shard(shard).compact()
+
+        # Move the new shards and index in, then drop old shard files that
+        # were not overwritten
+        new_files = set()
+        for name in os.listdir(staging):
+            if name.endswith(".lock"):
+                continue
+            os.replace(os.path.join(staging, name), os.path.join(self.directory, name))
+            new_files.add(os.path.join(self.directory, name))
+        for path in old_files:
+            if path not in new_files and os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree(staging)
+
+        self._shards = {}
+        self._load_index()
+
+    def _shard_for(self, user):
+        if user not in self.users:
+            self._load_index()  # Another process may have added the user
+        return self.users.get(user)
+
+    def _assign_shards(self, users):
+        """Give every user without a shard one, in a single locked index update"""
+        if users.issubset(self.users):
+            return
+        self._load_index()  # Another process may have added them
+        if users.issubset(self.users):
+            return
+        with locked_file(self.index_lock_path):
+            self._load_index()
+            new_users = users.difference(self.users)
+            if new_users:
+                for user in new_users:
+                    self.users[user] = zlib.crc32(user.encode("utf-8")) % self.shard_count
+                self._write_index()
+
+    def _shard(self, shard):
+        if shard not in self._shards:
+            base = os.path.join(self.directory, f"shard-{shard:04d}")
+            self._shards[shard] = JSONLinesStore(base + ".json", base + ".jsonl")
+        return self._shards[shard]
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r") as file:
+                index = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        self.shard_count, self.users = index["shard_count"], index["users"]
+
+    def _write_index(self):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as file:
+            json.dump({"shard_count": self.shard_count, "users": self.users}, file, separators=(",", ":"))
+        os.replace(tmp_path, self.index_path)
+
+
+class ColumnarStore:
+    """BMI history as little-endian binary columns, one directory per user.
+
+    Each user directory holds ``ts`` (int64 seconds, see entries_to_arrays)
+    and float32 ``weight``, ``height`` and ``bmi`` files. history_arrays()
+    loads them with np.fromfile, so charting a long history needs no
+    per-row parsing or dict allocation. Columns are appended under a per-user
+    lock. If a crash leaves them with different lengths, they are cut back to
+    their common length before the next append, and reads ignore the excess.
+    """
+
+    COLUMNS = (("ts", "<i8"), ("weight", "<f4"), ("height", "<f4"), ("bmi", "<f4"))
+
+    def __init__(self, directory=COLUMNAR_DIRECTORY):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def append(self, user, entry):
+        self.append_many([(user, entry)])
+
+    def append_many(self, records):
+        by_user = {}
+        for user, entry in records:
+            by_user.setdefault(user, []).append(entry)
+
+        for user, entries in by_user.items():
+            user_dir = self._user_dir(user)
+            os.makedirs(user_dir, exist_ok=True)
+            arrays = entries_to_arrays(entries)
+            with locked_file(os.path.join(user_dir, ".lock")):
+                self._truncate_to_common_length(user_dir)
+                for (name, dtype), values in zip(self.COLUMNS, arrays):
+                    with open(os.path.join(user_dir, name), "ab") as file:
+                        file.write(values.astype(dtype).tobytes())
+
+    def history_arrays(self, user):
+        import_numpy()
+        user_dir = self._user_dir(user)
+        if not os.path.isdir(user_dir):
+            return tuple(np.empty(0, dtype) for _, dtype in self.COLUMNS)
+        with locked_file(os.path.join(user_dir, ".lock"), shared=True):
+            columns = [
+                np.fromfile(os.path.join(user_dir, name), dtype=dtype)
+                if os.path.exists(os.path.join(user_dir, name)) else np.empty(0, dtype)
+                for name, dtype in self.COLUMNS
+            ]
+        length = min(len(column) for column in columns)
+        return tuple(column[:length] for column in columns)
+
+    def history(self, user):
+        timestamps, weights, heights, bmis = self.history_arrays(user)
+        dates = np.datetime_as_string(timestamps.astype("datetime64[s]"), unit="s")
+        # The shortest float32 repr turns e.g. 70.19999694824219 back into 70.2
+        weights, heights, bmis = (values.astype(str).astype(np.float64).tolist()
+                                  for values in (weights, heights, bmis))
+        return [
+            {"date": d.replace("T", " "), "weight": w, "height": h, "bmi": b}
+            for d, w, h, b in zip(dates.tolist(), weights, heights, bmis)
+        ]
+
+    def rollups(self, user, period):
+        return rollup_rows(self.rollup_buckets(user, period))
+
+    def rollup_buckets(self, user, period):
+        return compute_rollup_buckets(self.history(user), period)
+
+    def close(self):
+        pass
+
+    def _user_dir(self, user):
+        # Hex keeps any username filesystem-safe and case-distinct
+        return os.path.join(self.directory, user.encode("utf-8").hex())
+
+    def _truncate_to_common_length(self, user_dir):
+        paths = [(os.path.join(user_dir, name), np.dtype(dtype).itemsize) for name, dtype in self.COLUMNS]
+        lengths = [JSONLinesStore._size(path) // itemsize for path, itemsize in paths]
+        common = min(lengths)
+        for (path, itemsize), length in zip(paths, lengths):
+            if length != common or JSONLinesStore._size(path) % itemsize:
+                os.truncate(path, common * itemsize)
+
+
+def shard_monolithic_store(source, directory=SHARD_DIRECTORY, shard_count=SHARD_COUNT):
+    """Copy every user from a single-file store into a new ShardedStore."""
+    target = ShardedStore(directory, shard_count)
+    target.append_many((user, entry) for user, entries in source.load_all().items() for entry in entries)
+    return target
+
+
+STORE_BACKENDS = {
+    "jsonl": JSONLinesStore,
+    "sqlite": SQLiteStore,
+    "sharded": ShardedStore,
+    "columnar": ColumnarStore,
+}
+
+
+def open_store(backend=STORAGE_BACKEND, **kwargs):
+    if backend not in STORE_BACKENDS:
+        raise ValueError(f"Unknown storage backend: {backend!r}")
+    return STORE_BACKENDS[backend](**kwargs)
+
+
+def downsample_minmax(x, y, x_min, x_max, buckets):
+    """Reduce sorted (x, y) to the min and max point of each x bucket in [x_min, x_max].
+
+    Keeps the visual envelope of the series at one bucket per pixel column;
+    each bucket's first and last points are kept too so the line joins up.
+    The nearest point outside each end of the range is kept, so lines still
+    run to the edge of the axes. Series already short enough are returned
+    as-is.
+    """
+    import_numpy()
+    lo = max(np.searchsorted(x, x_min, side='left') - 1, 0)
+    hi = min(np.searchsorted(x, x_max, side='right') + 1, len(x))
+    if hi - lo <= 2 * buckets:
+        return x[lo:hi], y[lo:hi]
+
+    xs, ys = x[lo:hi], y[lo:hi]
+    # floor, not a truncating cast, so points just left of x_min land in bucket -1
+    bucket = np.floor((xs - x_min) / ((x_max - x_min) or 1.0) * buckets).astype(np.int64)
+    np.clip(bucket, -1, buckets, out=bucket)
+
+    # x is sorted, so every bucket is a contiguous run of indices
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    counts = np.diff(np.r_[starts, len(xs)])
+    keep = [starts, starts + counts - 1]
+    for reduce in (np.minimum, np.maximum):
+        extreme = np.repeat(reduce.reduceat(ys, starts), counts)
+        hits = np.flatnonzero(ys == extreme)
+        _, first = np.unique(np.searchsorted(starts, hits, side='right'), return_index=True)
+        keep.append(hits[first])
+    keep = np.unique(np.concatenate(keep))
+    return xs[keep], ys[keep]
+
+
+class HistoryView:
+    """History window holding a single BMI/weight figure.
+
+    The window, figure, axes and lines are created once; showing another
+    user only swaps the line data and axis limits. The figure is created
+    directly rather than through pyplot, so nothing keeps it alive once the
+    window is closed.
+
+    Long series are drawn min/max-downsampled to the pixel width of the axes
+    and re-aggregated whenever the visible date range changes (toolbar zoom
+    or pan). The full series stays in ``dates``/``bmis``/``weights`` and can
+    be drawn unreduced with the "Show all points" toggle.
+
+    The view selector switches between raw entries and daily/weekly/monthly
+    averages; ``load_series(user, period)`` supplies the data for either, so
+    trend views only ever read the store's rollups.
+
+    load() runs ``load_series`` and the initial downsampling on a worker
+    thread while the window stays responsive; the Tk loop polls for the
+    worker's messages with ``after``. The worker posts the loaded series
+    before downsampling it and checks for cancellation between stages, so
+    starting another load or closing the window stops it at the next stage
+    and anything it already posted is discarded.
+    """
+
+    # Above this many visible points markers are dropped, as they would
+    # overlap into a solid band anyway
+    MARKER_LIMIT = 200
+    VIEW_PERIODS = {"Entries": None, "Daily": "day", "Weekly": "week", "Monthly": "month"}
+
+    def __init__(self, parent, colors, load_series, on_close=None):
+        import_charting()
+        self.colors = colors
+        self.load_series = load_series
+        self.on_close = on_close
+        self.user = None
+        self.period = None
+        self._cancel_load = None
+        self._poll_id = None
+        self._envelope = None
+
+        self.window = tk.Toplevel(parent)
+        self.window.geometry("900x600")
+        self.window.configure(bg=colors['bg_primary'])
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        with matplotlib.style.context('dark_background'):
+            self.fig = Figure(figsize=(10, 8), facecolor=colors['bg_primary'])
+            self.ax1, self.ax2 = self.fig.subplots(2, 1)
+            self._build_axes()
+
+        self.dates = self.bmis = self.weights = None
+        self.show_raw_var = tk.BooleanVar(master=self.window, value=False)
+        self.view_var = tk.StringVar(master=self.window, value="Entries")
+
+        controls = tk.Frame(self.window, bg=colors['bg_primary'])
+        controls.pack(side='bottom', fill='x')
+        view_menu = ttk.Combobox(
+            controls,
+            textvariable=self.view_var,
+            values=list(self.VIEW_PERIODS),
+            state='readonly',
+            width=10
+        )
+        view_menu.bind('<<ComboboxSelected>>', lambda event: self.change_period())
+        view_menu.pack(side='right', padx=10)
+        tk.Checkbutton(
+            controls,
+            text="Show all points",
+            variable=self.show_raw_var,
+            command=self.refresh_lines,
+            font=("Segoe UI", 10),
+            bg=colors['bg_primary'],
+            fg=colors['text_secondary'],
+            selectcolor=colors['bg_secondary'],
+            activebackground=colors['bg_primary'],
+            activeforeground=colors['text_primary']
+        ).pack(side='right', padx=10)
+        self.status_label = tk.Label(
+            controls,
+            font=("Segoe UI", 10),
+            bg=colors['bg_primary'],
+            fg=colors['text_muted']
+        )
+        self.status_label.pack(side='right', padx=10)
+
+        self.canvas = FigureCanvasTkAgg(self.fig, self.window)
+        self.toolbar = NavigationToolbar2Tk(self.canvas, controls, pack_toolbar=False)
+        self.toolbar.pack(side='left')
+        self.canvas.get_tk_widget().pack(fill='both', expand=True)
+
+        self.ax1.callbacks.connect('xlim_changed', lambda ax: self.refresh_lines())
+
+    def _build_axes(self):
+        ax1, ax2 = self.ax1, self.ax2
+
+        # BMI chart with better colors
+        self.bmi_line, = ax1.plot([], [], 'o-', color=self.colors['accent'], linewidth=3, markersize=8, alpha=0.9)
+        ax1.axhspan(0, 18.5, alpha=0.15, color=self.colors['underweight'], label='Underweight')
+        ax1.axhspan(18.5, 25, alpha=0.15, color=self.colors['normal'], label='Normal')
+        ax1.axhspan(25, 30, alpha=0.15, color=self.colors['overweight'], label='Overweight')
+        # Extends past any realistic BMI; the visible top is set through ylim
+        ax1.axhspan(30, 1000, alpha=0.15, color=self.colors['obese'], label='Obese')
+
+        ax1.set_ylabel('BMI', fontsize=12, color='white', fontweight='bold')
+        self.title = ax1.set_title("", fontsize=14, color='white', fontweight='bold', pad=20)
+        ax1.grid(True, alpha=0.2, color='gray')
+        ax1.legend(loc='upper right', framealpha=0.9, facecolor=self.colors['bg_secondary'])
+        ax1.set_facecolor(self.colors['bg_primary'])
+
+        # Weight chart with better styling
+        ax2.sharex(ax1)
+        self.weight_line, = ax2.plot([], [], 's-', color=self.colors['warning'], linewidth=3, markersize=8, alpha=0.9)
+        ax2.set_ylabel('Weight (kg)', fontsize=12, color='white', fontweight='bold')
+        ax2.set_xlabel('Date', fontsize=12, color='white', fontweight='bold')
+        ax2.grid(True, alpha=0.2, color='gray')
+        ax2.set_facecolor(self.colors['bg_primary'])
+
+        # Format x-axis
+        for ax in [ax1, ax2]:
+            ax.xaxis_date()
+            ax.xaxis.set_major_locator(mdates.AutoDateLocator(maxticks=10))
+            ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
+            ax.tick_params(axis='x', labelrotation=45)
+            ax.tick_params(colors='white')
+
+    def change_period(self):
+        self.period = self.VIEW_PERIODS[self.view_var.get()]
+        if self.user is not None:
+            self.load(self.user)
+
+    def load(self, user):
+        """Load ``user``'s series for the current period in the background, then show it."""
+        self.cancel_load()
+        cancel = self._cancel_load = threading.Event()
+        results = queue.Queue()
+        buckets = max(int(self.ax1.bbox.width), 1)
+
+        self.status_label.config(text=f"Loading {user}'s history...")
+        self.window.deiconify()
+        self.window.lift()
+        threading.Thread(
+            target=self._load_worker,
+            args=(user, self.period, buckets, cancel, results),
+            name="history-loader",
+            daemon=True
+        ).start()
+        self._poll_id = self.window.after(LOAD_POLL_MS, self._poll_load, user, cancel, results)
+
+    def cancel_load(self):
+        if self._cancel_load is not None:
+            self._cancel_load.set()
+            self._cancel_load = None
+        if self._poll_id is not None:
+            self.window.after_cancel(self._poll_id)
+            self._poll_id = None
+
+    def _load_worker(self, user, period, buckets, cancel, results):
+        # Runs off the Tk thread: touch only the store and NumPy here
+        try:
+            dates, bmis, weights = self.load_series(user, period)
+            if cancel.is_set():
+                return
+            results.put(("series", (dates, bmis, weights)))
+            if not len(dates):
+                return
+
+            x_min, x_max = self._padded(dates[0], dates[-1])
+            points = []
+            for y in (bmis, weights):
+                if cancel.is_set():
+                    return
+                points.append(downsample_minmax(dates, y, x_min, x_max, buckets))
+            results.put(("envelope", ((x_min, x_max, buckets), points)))
+        except Exception as e:
+            results.put(("error", e))
+
+    def _poll_load(self, user, cancel, results, series=None):
+        if cancel.is_set():
+            return
+        while True:
+            try:
+                kind, payload = results.get_nowait()
+            except queue.Empty:
+                self._poll_id = self.window.after(
+                    LOAD_POLL_MS, self._poll_load, user, cancel, results, series
+                )
+                return
+
+            if kind == "series":
+                series = payload
+                if len(series[0]):
+                    self.status_label.config(text=f"Drawing {len(series[0])} points...")
+                    continue
+            break
+
+        self._poll_id = self._cancel_load = None
+        self.status_label.config(text="")
+        if kind == "error":
+            messagebox.showerror("Error", f"Could not display graph: {str(payload)}")
+            return
+
+        dates, bmis, weights = series
+        if not len(dates):
+            messagebox.showinfo("No Data", "No BMI history found for this user.")
+            if self.dates is None:
+                self.close()  # Nothing else to show in a freshly opened window
+            return
+        self.show(user, dates, bmis, weights, envelope=payload)
+
+    def show(self, user, dates, bmis, weights, envelope=None):
+        self.user = user
+        self._envelope = envelope
+        self.window.title(f"{user}'s BMI History")
+        if self.period is None:
+            self.title.set_text(f"{user}'s BMI Progress")
+        else:
+            self.title.set_text(f"{user}'s {self.view_var.get()} Average BMI")
+
+        self.dates, self.bmis, self.weights = dates, bmis, weights
+
+        self.ax1.set_ylim(0, max(bmis.max() + 2, 35))
+        self.ax2.set_ylim(*self._padded(weights.min(), weights.max(), empty_span=10.0))
+        self.ax1.set_xlim(*self._padded(dates[0], dates[-1]))  # Also triggers refresh_lines
+        for ax in [self.ax1, self.ax2]:
+            for label in ax.get_xticklabels():
+                label.set_horizontalalignment('right')
+
+        self.fig.tight_layout()
+        self.canvas.draw_idle()
+        self.window.deiconify()
+        self.window.lift()
+
+    def refresh_lines(self):
+        if self.dates is None:
+            return
+
+        if self.show_raw_var.get():
+            points = [(self.dates, self.bmis), (self.dates, self.weights)]
+        else:
+            x_min, x_max = self.ax1.get_xlim()
+            buckets = max(int(self.ax1.bbox.width), 1)
+            if self._envelope is not None and self._envelope[0] == (x_min, x_max, buckets):
+                points = self._envelope[1]  # Already computed by the loader thread
+            else:
+                points = [downsample_minmax(self.dates, y, x_min, x_max, buckets)
+                          for y in (self.bmis, self.weights)]
+
+        for line, (x, y), marker in zip([self.bmi_line, self.weight_line], points, 'os'):
+            line.set_data(x, y)
+            line.set_marker(marker if len(x) <= self.MARKER_LIMIT else '')
+        self.canvas.draw_idle()
+
+    @staticmethod
+    def _padded(low, high, margin=0.05, empty_span=1.0):
+        span = (high - low) or empty_span
+        return low - span * margin, high + span * margin
+
+    def close(self):
+        self.cancel_load()
+        self.canvas.get_tk_widget().destroy()
+        self.window.destroy()
+        self.fig.clear()
+        if self.on_close:
+            self.on_close()
+
 
 class ModernBMICalculator:
-    def __init__(self, root):
+    def __init__(self, root, store=None):
         self.root = root
+        self.store = store or CachedStore(open_store())
+        self.history_view = None
+        self.gauge_canvas = None
         self.setup_styles()  # Setup styles first
         self.setup_window()
         self.create_widgets()
+        self.root.after(WARMUP_DELAY_MS, self.warm_up_charting)
+        
+    def warm_up_charting(self):
+        threading.Thread(target=import_charting, name="charting-warmup", daemon=True).start()
+        
+    def on_close(self):
+        while True:
+            try:
+                self.store.close()  # Flush queued saves before exiting
+                break
+            except Exception as e:
+                if messagebox.askretrycancel(
+                    "Error",
+                    f"Could not save your latest entries: {str(e)}\n\n"
+                    "Retry, or Cancel to exit without them."
+                ):
+                    continue
+                self.store.discard_pending()
+                self.store.close()
+                break
+        self.root.destroy()
         
     def setup_window(self):
         self.root.title("Modern BMI Calculator")
@@ -24,6 +1211,7 @@ class ModernBMICalculator:
         
         # Center the window
         self.root.eval('tk::PlaceWindow . center')
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
     def setup_styles(self):
         self.colors = {
@@ -48,38 +1236,22 @@ class ModernBMICalculator:
         }
         
     def calculate_bmi(self, weight, height):
-        return weight / (height ** 2)
+        # height * height rather than height ** 2: pow() is not correctly
+        # rounded on every libm, and this must match calculate_bmi_batch exactly
+        return weight / (height * height)
 
     def classify_bmi(self, bmi):
-        if bmi < 18.5:
-            return "Underweight", self.colors['underweight']
-        elif bmi < 25:
-            return "Normal Weight", self.colors['normal']
-        elif bmi < 30:
-            return "Overweight", self.colors['overweight']
-        else:
-            return "Obese", self.colors['obese']
+        code = bisect_right(BMI_THRESHOLDS, bmi) if bmi == bmi else len(BMI_THRESHOLDS)  # NaN sorts last, as in np.digitize
+        return BMI_CATEGORIES[code], self.colors[BMI_COLOR_KEYS[code]]
 
     def save_bmi(self, user, bmi, weight, height):
-        try:
-            with open(DATA_FILE, "r") as file:
-                data = json.load(file)
-        except (FileNotFoundError, json.JSONDecodeError):
-            data = {}
-
-        if user not in data:
-            data[user] = []
-
-        data[user].append({
+        self.store.append(user, {
             "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "weight": weight,
             "height": height,
             "bmi": bmi
         })
 
-        with open(DATA_FILE, "w") as file:
-            json.dump(data, file, indent=4)
-
     def create_rounded_button(self, parent, text, command, bg_color, hover_color):
         button_frame = tk.Frame(parent, bg=self.colors['bg_primary'])
         
@@ -142,34 +1314,23 @@ class ModernBMICalculator:
         )
         canvas.pack(pady=20)
         
-        # Draw gauge background
-        center_x, center_y = 150, 140
-        radius = 100
-        
-        # BMI ranges with colors
-        ranges = [
-            (0, 0.25, self.colors['underweight']),    # Underweight (0-18.5)
-            (0.25, 0.5, self.colors['normal']),       # Normal (18.5-25)
-            (0.5, 0.75, self.colors['overweight']),   # Overweight (25-30)
-            (0.75, 1.0, self.colors['obese'])         # Obese (30+)
-        ]
+        center_x, center_y = GAUGE_CENTER
+        radius = GAUGE_RADIUS
         
         # Draw gauge sections
-        start_angle = 180
-        for i, (start_ratio, end_ratio, color) in enumerate(ranges):
-            extent = (end_ratio - start_ratio) * 180
+        for start, extent, color_key in GAUGE_SECTIONS:
             canvas.create_arc(
                 center_x - radius, center_y - radius,
                 center_x + radius, center_y + radius,
-                start=start_angle - start_ratio * 180,
-                extent=-extent,
-                fill=color,
+                start=start,
+                extent=extent,
+                fill=self.colors[color_key],
                 outline="",
                 width=0
             )
         
         # Draw inner circle to create donut effect
-        inner_radius = 60
+        inner_radius = GAUGE_INNER_RADIUS
         canvas.create_oval(
             center_x - inner_radius, center_y - inner_radius,
             center_x + inner_radius, center_y + inner_radius,
@@ -177,62 +1338,8 @@ class ModernBMICalculator:
             outline=""
         )
         
-        # Add BMI value and category text
-        if bmi_value is not None:
-            canvas.create_text(
-                center_x, center_y - 15,
-                text=f"{bmi_value:.1f}",
-                font=("Segoe UI", 24, "bold"),
-                fill=self.colors['text_primary']
-            )
-            
-            if category:
-                canvas.create_text(
-                    center_x, center_y + 15,
-                    text=category,
-                    font=("Segoe UI", 12, "bold"),
-                    fill=self.colors['text_secondary']
-                )
-                
-                # Draw needle
-                if bmi_value <= 18.5:
-                    needle_angle = (bmi_value / 18.5) * 45
-                elif bmi_value <= 25:
-                    needle_angle = 45 + ((bmi_value - 18.5) / 6.5) * 45
-                elif bmi_value <= 30:
-                    needle_angle = 90 + ((bmi_value - 25) / 5) * 45
-                else:
-                    needle_angle = 135 + min(((bmi_value - 30) / 10) * 45, 45)
-                
-                needle_angle = 180 - needle_angle  # Adjust for canvas coordinates
-                needle_rad = np.radians(needle_angle)
-                needle_length = 70
-                
-                end_x = center_x + needle_length * np.cos(needle_rad)
-                end_y = center_y - needle_length * np.sin(needle_rad)
-                
-                canvas.create_line(
-                    center_x, center_y,
-                    end_x, end_y,
-                    fill=self.colors['accent'],
-                    width=3
-                )
-                
-                # Needle center circle
-                canvas.create_oval(
-                    center_x - 8, center_y - 8,
-                    center_x + 8, center_y + 8,
-                    fill=self.colors['accent'],
-                    outline=""
-                )
-        
         # Add labels
-        labels = ["18.5", "25", "30", "40+"]
-        label_positions = [45, 90, 135, 165]
-        for label, angle in zip(labels, label_positions):
-            angle_rad = np.radians(180 - angle)
-            label_x = center_x + (radius + 20) * np.cos(angle_rad)
-            label_y = center_y - (radius + 20) * np.sin(angle_rad)
+        for label, label_x, label_y in GAUGE_LABELS:
             canvas.create_text(
                 label_x, label_y,
                 text=label,
@@ -240,69 +1347,105 @@ class ModernBMICalculator:
                 fill=self.colors['text_secondary']
             )
         
+        # Value, category and needle items start hidden and are moved and
+        # re-labelled in place by update_bmi_gauge()
+        self.gauge_items = {
+            'value': canvas.create_text(
+                center_x, center_y - 15,
+                font=("Segoe UI", 24, "bold"),
+                fill=self.colors['text_primary'],
+                state='hidden'
+            ),
+            'category': canvas.create_text(
+                center_x, center_y + 15,
+                font=("Segoe UI", 12, "bold"),
+                fill=self.colors['text_secondary'],
+                state='hidden'
+            ),
+            'needle': canvas.create_line(
+                center_x, center_y, center_x, center_y,
+                fill=self.colors['accent'],
+                width=3,
+                state='hidden'
+            ),
+            # Needle center circle
+            'hub': canvas.create_oval(
+                center_x - 8, center_y - 8,
+                center_x + 8, center_y + 8,
+                fill=self.colors['accent'],
+                outline="",
+                state='hidden'
+            )
+        }
+        self.gauge_canvas = canvas
+        
+        if bmi_value is not None:
+            self.update_bmi_gauge(bmi_value, category)
+        
         return canvas
 
+    def update_bmi_gauge(self, bmi_value, category=None):
+        canvas, items = self.gauge_canvas, self.gauge_items
+        canvas.itemconfigure(items['value'], text=f"{bmi_value:.1f}", state='normal')
+        
+        if not category:
+            for key in ('category', 'needle', 'hub'):
+                canvas.itemconfigure(items[key], state='hidden')
+            return
+        
+        canvas.itemconfigure(items['category'], text=category, state='normal')
+        
+        # Needle position
+        if bmi_value <= 18.5:
+            needle_angle = (bmi_value / 18.5) * 45
+        elif bmi_value <= 25:
+            needle_angle = 45 + ((bmi_value - 18.5) / 6.5) * 45
+        elif bmi_value <= 30:
+            needle_angle = 90 + ((bmi_value - 25) / 5) * 45
+        else:
+            needle_angle = 135 + min(((bmi_value - 30) / 10) * 45, 45)
+        
+        needle_rad = math.radians(180 - needle_angle)  # Adjust for canvas coordinates
+        center_x, center_y = GAUGE_CENTER
+        canvas.coords(
+            items['needle'],
+            center_x, center_y,
+            center_x + GAUGE_NEEDLE_LENGTH * math.cos(needle_rad),
+            center_y - GAUGE_NEEDLE_LENGTH * math.sin(needle_rad)
+        )
+        canvas.itemconfigure(items['needle'], state='normal')
+        canvas.itemconfigure(items['hub'], state='normal')
+
     def show_enhanced_graph(self, user):
         try:
-            with open(DATA_FILE, "r") as file:
-                data = json.load(file)
-
-            entries = data.get(user, [])
-            if not entries:
-                messagebox.showinfo("No Data", "No BMI history found for this user.")
-                return
+            # The history window and its figure are built once and reused;
+            # the data itself is loaded off the Tk thread
+            if self.history_view is None:
+                self.history_view = HistoryView(
+                    self.root, self.colors, self.load_history_series, on_close=self.on_history_closed
+                )
+            self.history_view.load(user)
 
-            # Create new window for graph
-            graph_window = tk.Toplevel(self.root)
-            graph_window.title(f"{user}'s BMI History")
-            graph_window.geometry("900x600")
-            graph_window.configure(bg=self.colors['bg_primary'])
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not display graph: {str(e)}")
 
-            # Prepare data
-            dates = [datetime.strptime(e["date"], "%Y-%m-%d %H:%M:%S") for e in entries]
-            bmis = [e["bmi"] for e in entries]
-            weights = [e["weight"] for e in entries]
+    def load_history_series(self, user, period=None):
+        """Return sorted (dates, bmis, weights) arrays: raw entries, or rollup means for a period."""
+        import_charting()
+        if period is None:
+            timestamps, weights, _, bmis = self.store.history_arrays(user)
+            dates = mdates.date2num(timestamps.astype("datetime64[s]"))
+        else:
+            rows = self.store.rollups(user, period)
+            dates = mdates.date2num(np.array([r["bucket"] for r in rows], dtype="datetime64[D]"))
+            bmis = np.array([r["bmi_mean"] for r in rows])
+            weights = np.array([r["weight_mean"] for r in rows])
 
-            # Create matplotlib figure with improved dark theme
-            plt.style.use('dark_background')
-            fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 8), facecolor=self.colors['bg_primary'])
-            
-            # BMI chart with better colors
-            ax1.plot(dates, bmis, 'o-', color=self.colors['accent'], linewidth=3, markersize=8, alpha=0.9)
-            ax1.axhspan(0, 18.5, alpha=0.15, color=self.colors['underweight'], label='Underweight')
-            ax1.axhspan(18.5, 25, alpha=0.15, color=self.colors['normal'], label='Normal')
-            ax1.axhspan(25, 30, alpha=0.15, color=self.colors['overweight'], label='Overweight')
-            ax1.axhspan(30, max(max(bmis) + 2, 35), alpha=0.15, color=self.colors['obese'], label='Obese')
-            
-            ax1.set_ylabel('BMI', fontsize=12, color='white', fontweight='bold')
-            ax1.set_title(f"{user}'s BMI Progress", fontsize=14, color='white', fontweight='bold', pad=20)
-            ax1.grid(True, alpha=0.2, color='gray')
-            ax1.legend(loc='upper right', framealpha=0.9, facecolor=self.colors['bg_secondary'])
-            ax1.set_facecolor(self.colors['bg_primary'])
-            
-            # Weight chart with better styling
-            ax2.plot(dates, weights, 's-', color=self.colors['warning'], linewidth=3, markersize=8, alpha=0.9)
-            ax2.set_ylabel('Weight (kg)', fontsize=12, color='white', fontweight='bold')
-            ax2.set_xlabel('Date', fontsize=12, color='white', fontweight='bold')
-            ax2.grid(True, alpha=0.2, color='gray')
-            ax2.set_facecolor(self.colors['bg_primary'])
-            
-            # Format x-axis
-            for ax in [ax1, ax2]:
-                ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-                ax.xaxis.set_major_locator(mdates.DayLocator(interval=max(1, len(dates)//10)))
-                plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
-                ax.tick_params(colors='white')
-
-            plt.tight_layout()
-            
-            # Embed plot in tkinter window
-            canvas = FigureCanvasTkAgg(fig, graph_window)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill='both', expand=True)
+        order = np.argsort(dates, kind='stable')  # Imports may arrive out of order
+        return dates[order], bmis[order], weights[order]
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not display graph: {str(e)}")
+    def on_history_closed(self):
+        self.history_view = None
 
     def submit(self):
         try:
@@ -321,8 +1464,7 @@ class ModernBMICalculator:
             category, color = self.classify_bmi(bmi)
 
             # Update result display
-            self.result_frame.destroy()
-            self.create_result_display(bmi, category, color)
+            self.update_result_display(bmi, category, color)
             
             # Save data
             self.save_bmi(user, bmi, weight, height)
@@ -340,12 +1482,11 @@ class ModernBMICalculator:
                 fg=self.colors['danger']
             )
 
-    def create_result_display(self, bmi, category, color):
-        self.result_frame = tk.Frame(self.main_frame, bg=self.colors['bg_primary'])
-        self.result_frame.pack(fill="x", pady=25)
+    def create_result_display(self):
+        self.result_frame.pack_configure(pady=25)
         
         # Create BMI gauge
-        self.create_bmi_gauge(self.result_frame, bmi, category)
+        self.create_bmi_gauge(self.result_frame)
         
         # BMI details card with better styling
         details_card = tk.Frame(self.result_frame, bg=self.colors['bg_card'], relief="flat", highlightthickness=1, highlightcolor=self.colors['border'])
@@ -358,21 +1499,29 @@ class ModernBMICalculator:
         content_frame = tk.Frame(details_card, bg=self.colors['bg_card'])
         content_frame.pack(fill="x", padx=25, pady=20)
         
-        tk.Label(
+        self.bmi_label = tk.Label(
             content_frame,
-            text=f"Your BMI: {bmi:.1f}",
             font=("Segoe UI", 22, "bold"),
-            bg=self.colors['bg_card'],
-            fg=color
-        ).pack(pady=(0, 8))
+            bg=self.colors['bg_card']
+        )
+        self.bmi_label.pack(pady=(0, 8))
         
-        tk.Label(
+        self.category_label = tk.Label(
             content_frame,
-            text=f"Category: {category}",
             font=("Segoe UI", 15),
             bg=self.colors['bg_card'],
             fg=self.colors['text_secondary']
-        ).pack()
+        )
+        self.category_label.pack()
+
+    def update_result_display(self, bmi, category, color):
+        # The result widgets are built on the first result and reused after
+        if self.gauge_canvas is None:
+            self.create_result_display()
+        
+        self.update_bmi_gauge(bmi, category)
+        self.bmi_label.config(text=f"Your BMI: {bmi:.1f}", fg=color)
+        self.category_label.config(text=f"Category: {category}")
 
     def create_widgets(self):
         # Main container
@@ -452,7 +1601,477 @@ class ModernBMICalculator:
         self.result_frame.pack(fill="x")
 
 
+# Stands in for an unreadable import record; its missing user makes bulk_import() skip it
+MALFORMED_ROW = (None, None, None, None)
+
+
+def read_import_rows(path, fmt=None):
+    """Stream (user, date, weight, height) tuples from a CSV or JSON-lines file.
+
+    A malformed line or a record missing a field yields MALFORMED_ROW, which
+    bulk_import() counts as skipped, so one bad record cannot abort a long
+    import partway through.
+    """
+    if fmt is None:
+        fmt = "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+
+    with open(path, "r", newline="") as file:
+        lines = csv.DictReader(file) if fmt == "csv" else (line for line in file if line.strip())
+        for line in lines:
+            try:
+                record = line if fmt == "csv" else json.loads(line)
+                yield record["user"], record["date"], record["weight"], record["height"]
+            except (json.JSONDecodeError, KeyError, TypeError):
+                yield MALFORMED_ROW
+
+
+def bulk_import(store, rows, batch_size=IMPORT_BATCH_SIZE, progress=None):
+    """Compute BMI for ``rows`` chunk by chunk and append each chunk in one batch.
+
+    Returns (imported, skipped) row counts. Rows with a missing user, a date
+    not in the "%Y-%m-%d %H:%M:%S" format used by save_bmi, or a non-positive
+    weight/height are skipped, mirroring the checks in submit().
+    """
+    import_numpy()
+    imported = skipped = 0
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, batch_size))
+        if not chunk:
+            break
+
+        users, dates, weights, heights = zip(*chunk)
+        try:
+            weights = np.asarray(weights, dtype=np.float64)
+            heights = np.asarray(heights, dtype=np.float64)
+        except (TypeError, ValueError):
+            # Unparseable numbers somewhere in the chunk; fall back per value
+            weights = np.array([_to_float(w) for w in weights])
+            heights = np.array([_to_float(h) for h in heights])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            bmis = calculate_bmi_batch(weights, heights)
+        valid = (weights > 0) & (heights > 0) & (heights <= 3)
+
+        records = [
+            (user, {"date": entry_date, "weight": weight, "height": height, "bmi": bmi})
+            for user, entry_date, weight, height, bmi, ok in zip(
+                users, dates, weights.tolist(), heights.tolist(), bmis.tolist(), valid.tolist()
+            )
+            if ok and user and _is_entry_date(entry_date)
+        ]
+        store.append_many(records)
+        imported += len(records)
+        skipped += len(chunk) - len(records)
+        if progress:
+            progress(imported, skipped)
+
+    return imported, skipped
+
+
+def _is_entry_date(value):
+    # fromisoformat is much faster than strptime; the length check pins it
+    # to the full "%Y-%m-%d %H:%M:%S" form
+    try:
+        return len(value) == 19 and datetime.fromisoformat(value) is not None
+    except (TypeError, ValueError):
+        return False
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def run_import(args):
+    store = open_store(args.backend)
+    start = time.perf_counter()
+
+    def progress(imported, skipped):
+        elapsed = time.perf_counter() - start
+        print(f"\r{imported:,} rows imported, {skipped:,} skipped "
+              f"({imported / elapsed:,.0f} rows/s)", end="", file=sys.stderr)
+
+    try:
+        imported, skipped = bulk_import(
+            store, read_import_rows(args.path, args.format), args.batch_size, progress
+        )
+    finally:
+        store.close()
+
+    elapsed = time.perf_counter() - start
+    print(file=sys.stderr)
+    print(f"Imported {imported:,} rows ({skipped:,} skipped) in {elapsed:.2f}s "
+          f"- {imported / elapsed if elapsed else 0:,.0f} rows/s")
+
+
+# Run in a fresh interpreter by benchmark_startup(); prints timings as JSON
+_STARTUP_PROBE = """
+import importlib.util, json, os, sys, time
+start = time.perf_counter()
+if sys.argv[2] == "eager":
+    import numpy, matplotlib.dates, matplotlib.figure, matplotlib.backends.backend_tkagg
+spec = importlib.util.spec_from_file_location("bmi_calculator", sys.argv[1])
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+loaded = time.perf_counter()
+timings = {"module_load_s": loaded - start}
+if os.environ.get("DISPLAY") or sys.platform in ("win32", "darwin"):
+    root = module.tk.Tk()
+    app = module.ModernBMICalculator(root, store=module.JSONLinesStore())
+    root.update()
+    timings["first_frame_s"] = time.perf_counter() - start
+    app.on_close()
+print(json.dumps(timings))
+"""
+
+
+def benchmark_startup(runs=5, mode="lazy"):
+    """Time module load and first frame in fresh interpreters.
+
+    mode="eager" imports NumPy and matplotlib up front, as the script did
+    before they were loaded lazily, for comparison. first_frame_s is only
+    reported when a display is available.
+    """
+    import statistics
+    import subprocess
+    import tempfile
+    samples = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for _ in range(runs):
+            start = time.perf_counter()
+            output = subprocess.run(
+                [sys.executable, "-c", _STARTUP_PROBE, os.path.abspath(__file__), mode],
+                cwd=workdir, capture_output=True, text=True, check=True
+            ).stdout
+            sample = json.loads(output.strip().splitlines()[-1])
+            sample["process_s"] = time.perf_counter() - start
+            samples.append(sample)
+    return {key: statistics.median(s[key] for s in samples) for key in samples[0]}
+
+
+def run_startup_benchmark(args):
+    for mode in ("eager", "lazy"):
+        timings = benchmark_startup(args.runs, mode)
+        print(f"{mode:>5}: " + ", ".join(f"{key} {value * 1000:.0f} ms" for key, value in timings.items()))
+
+
+@contextmanager
+def _headless_tk():
+    """Replace Tk widgets with mocks and the Tk figure canvas with Agg.
+
+    Lets ModernBMICalculator and HistoryView run unchanged (and the figure
+    still really render) without a display.
+    """
+    from unittest import mock
+    import_charting()
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    class HeadlessCanvas(FigureCanvasAgg):
+        def __init__(self, figure, master=None):
+            super().__init__(figure)
+
+        def get_tk_widget(self):
+            return mock.MagicMock()
+
+    fake_tk = mock.MagicMock()
+    fake_tk.BooleanVar.return_value.get.return_value = False
+    fake_tk.StringVar.return_value.get.return_value = "Entries"
+    with mock.patch.dict(globals(), {
+        "tk": fake_tk,
+        "ttk": mock.MagicMock(),
+        "messagebox": mock.MagicMock(),
+        "FigureCanvasTkAgg": HeadlessCanvas,
+        "NavigationToolbar2Tk": mock.MagicMock(),
+    }):
+        yield
+
+
+@contextmanager
+def _working_directory(path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def _synthetic_records(count, users=100, start=datetime(2015, 1, 1)):
+    """Deterministic (user, entry) pairs, one reading per user per hour."""
+    import_numpy()
+    rng = np.random.default_rng(count)
+    weights = rng.uniform(45, 130, count).round(1)
+    heights = rng.uniform(1.45, 2.05, count).round(2)
+    bmis = calculate_bmi_batch(weights, heights)
+    for i, (weight, height, bmi) in enumerate(zip(weights.tolist(), heights.tolist(), bmis.tolist())):
+        entry_date = (start + timedelta(hours=i // users)).strftime("%Y-%m-%d %H:%M:%S")
+        yield f"user{i % users}", {"date": entry_date, "weight": weight, "height": height, "bmi": bmi}
+
+
+def _timings(func, repeat):
+    import statistics
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        "median_ms": statistics.median(samples) * 1000,
+        "p95_ms": samples[min(int(len(samples) * 0.95), len(samples) - 1)] * 1000,
+        "runs": repeat,
+    }
+
+
+def benchmark_save(sizes, backend=STORAGE_BACKEND, saves=200):
+    """save_bmi latency after the store already holds ``size`` entries."""
+    import tempfile
+    from unittest import mock
+    results = {}
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as workdir, _working_directory(workdir):
+            store = open_store(backend)
+            records = _synthetic_records(size)
+            while True:
+                batch = list(islice(records, IMPORT_BATCH_SIZE))
+                if not batch:
+                    break
+                store.append_many(batch)
+
+            with _headless_tk():
+                app = ModernBMICalculator(mock.MagicMock(), store=store)
+            direct = _timings(lambda: app.save_bmi("user0", 22.9, 70.0, 1.75), saves)
+
+            app.store = CachedStore(store)
+            cached = _timings(lambda: app.save_bmi("user0", 22.9, 70.0, 1.75), saves)
+            app.store.close()
+        results[str(size)] = {"direct": direct, "cached": cached}
+    return results
+
+
+def benchmark_history(sizes, repeat=5):
+    """load_history_series (data prep) and HistoryView.show + draw (render) for one user."""
+    import tempfile
+    from unittest import mock
+    results = {}
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as workdir, _working_directory(workdir):
+            store = open_store("sqlite")
+            store.append_many(_synthetic_records(size, users=1))
+            with _headless_tk():
+                app = ModernBMICalculator(mock.MagicMock(), store=store)
+                prep = _timings(lambda: app.load_history_series("user0"), repeat)
+                series = app.load_history_series("user0")
+
+                view = HistoryView(None, app.colors, app.load_history_series)
+
+                def render():
+                    view.show("user0", *series)
+                    view.canvas.draw()
+
+                render_timings = _timings(render, repeat)
+                view.close()
+            store.close()
+        results[str(size)] = {"data_prep": prep, "render": render_timings}
+    return results
+
+
+def benchmark_classification(count=1_000_000):
+    from unittest import mock
+    import_numpy()
+    rng = np.random.default_rng(0)
+    weights = rng.uniform(45, 130, count)
+    heights = rng.uniform(1.45, 2.05, count)
+    with _headless_tk():
+        app = ModernBMICalculator(mock.MagicMock(), store=mock.MagicMock())
+
+    weight_list, height_list = weights.tolist(), heights.tolist()
+    start = time.perf_counter()
+    for weight, height in zip(weight_list, height_list):
+        app.classify_bmi(app.calculate_bmi(weight, height))
+    scalar = time.perf_counter() - start
+
+    start = time.perf_counter()
+    classify_bmi_batch(calculate_bmi_batch(weights, heights))
+    batch = time.perf_counter() - start
+
+    return {
+        "count": count,
+        "scalar_per_s": count / scalar,
+        "batch_per_s": count / batch,
+    }
+
+
+def _git_commit():
+    import subprocess
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(args):
+    import platform
+    results = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": args.backend,
+        "save_bmi": benchmark_save(args.sizes, args.backend),
+        "history": benchmark_history([size for size in args.sizes if size <= args.max_history]),
+        "classification": benchmark_classification(),
+        "cold_start": benchmark_startup(args.runs),
+    }
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=4)
+    print(json.dumps(results, indent=4))
+
+
+def _stress_writer(backend, writer, saves, batch):
+    store = open_store(backend, **_STRESS_STORE_OPTIONS.get(backend, {}))
+    user = f"writer{writer}"
+    for first in range(0, saves, batch):
+        store.append_many([
+            (user, {"date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "weight": float(i), "height": 1.75, "bmi": i / 1.75 ** 2})
+            for i in range(first, min(first + batch, saves))
+        ])
+    store.close()
+
+
+# Small compaction threshold so the stress test compacts while writers run
+_STRESS_STORE_OPTIONS = {"jsonl": {"compact_min_bytes": 16 * 1024}}
+
+
+def stress_test(backend, writers, saves, batch=1):
+    """Run ``writers`` processes saving concurrently into one store.
+
+    Returns (elapsed seconds, {writer: problem}) where an empty dict means
+    every writer's saves are all present exactly once.
+    """
+    import tempfile
+    from multiprocessing import Process
+
+    with tempfile.TemporaryDirectory() as workdir, _working_directory(workdir):
+        start = time.perf_counter()
+        processes = [
+            Process(target=_stress_writer, args=(backend, writer, saves, batch))
+            for writer in range(writers)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+
+        store = open_store(backend)
+        problems = {}
+        for writer, process in enumerate(processes):
+            weights = sorted(int(e["weight"]) for e in store.history(f"writer{writer}"))
+            if process.exitcode != 0:
+                problems[writer] = f"exited with code {process.exitcode}"
+            elif weights != list(range(saves)):
+                problems[writer] = f"{len(weights)} of {saves} saves present"
+        store.close()
+    return elapsed, problems
+
+
+def run_stress_test(args):
+    elapsed, problems = stress_test(args.backend, args.writers, args.saves, args.batch)
+    total = args.writers * args.saves
+    print(f"{args.writers} writers x {args.saves} saves on {args.backend}: "
+          f"{total:,} saves in {elapsed:.2f}s ({total / elapsed:,.0f} saves/s)")
+    for writer, problem in sorted(problems.items()):
+        print(f"  writer{writer}: {problem}")
+    if problems:
+        sys.exit("Lost or duplicated updates detected")
+    print("No lost updates")
+
+
+def run_shard(args):
+    start = time.perf_counter()
+    if os.path.exists(os.path.join(args.directory, ShardedStore.INDEX_FILE)):
+        store = ShardedStore(args.directory)
+        previous = store.shard_count
+        store.rebalance(args.shards)
+        print(f"Rebalanced {len(store.users):,} users from {previous} to {args.shards} shards", end="")
+    else:
+        source = JSONLinesStore(args.source, args.source_log)
+        store = shard_monolithic_store(source, args.directory, args.shards)
+        print(f"Sharded {len(store.users):,} users from {args.source} into {args.shards} shards", end="")
+    print(f" in {time.perf_counter() - start:.2f}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Modern BMI Calculator")
+    parser.add_argument(
+        "--backend", dest="gui_backend", choices=sorted(STORE_BACKENDS), default=STORAGE_BACKEND,
+        help="storage used by the calculator window; use jsonl when several kiosks share "
+             "the data files on a network volume (default: $BMI_STORAGE_BACKEND or sqlite)"
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    import_parser = subparsers.add_parser(
+        "import", help="bulk-load a CSV or JSON-lines file of user,date,weight,height rows"
+    )
+    import_parser.add_argument("path")
+    import_parser.add_argument("--format", choices=["csv", "jsonl"],
+                               help="input format (default: guessed from the file extension)")
+    import_parser.add_argument("--backend", choices=sorted(STORE_BACKENDS), default=STORAGE_BACKEND)
+    import_parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    import_parser.set_defaults(func=run_import)
+
+    startup_parser = subparsers.add_parser(
+        "startup-benchmark", help="compare startup time with eager and lazy chart imports"
+    )
+    startup_parser.add_argument("--runs", type=int, default=5)
+    startup_parser.set_defaults(func=run_startup_benchmark)
+
+    bench_parser = subparsers.add_parser(
+        "benchmark", help="run the headless benchmark suite and save the results as JSON"
+    )
+    bench_parser.add_argument("--sizes", type=int, nargs="+",
+                              default=[100, 1000, 10_000, 100_000, 1_000_000],
+                              help="history sizes to measure save_bmi against")
+    bench_parser.add_argument("--max-history", type=int, default=100_000,
+                              help="largest single-user history to chart")
+    bench_parser.add_argument("--backend", choices=sorted(STORE_BACKENDS), default=STORAGE_BACKEND)
+    bench_parser.add_argument("--runs", type=int, default=5, help="cold-start runs")
+    bench_parser.add_argument("--output", default="bmi_benchmarks.json")
+    bench_parser.set_defaults(func=run_benchmarks)
+
+    stress_parser = subparsers.add_parser(
+        "stress-test", help="check for lost updates with parallel writer processes"
+    )
+    stress_parser.add_argument("--backend", choices=sorted(STORE_BACKENDS), default="jsonl")
+    stress_parser.add_argument("--writers", type=int, default=8)
+    stress_parser.add_argument("--saves", type=int, default=500, help="saves per writer")
+    stress_parser.add_argument("--batch", type=int, default=1, help="records per append_many call")
+    stress_parser.set_defaults(func=run_stress_test)
+
+    shard_parser = subparsers.add_parser(
+        "shard", help="split the single data file into per-user shards, or rebalance existing shards"
+    )
+    shard_parser.add_argument("--directory", default=SHARD_DIRECTORY)
+    shard_parser.add_argument("--shards", type=int, default=SHARD_COUNT)
+    shard_parser.add_argument("--source", default=DATA_FILE, help="monolithic data file to migrate from")
+    shard_parser.add_argument("--source-log", default=HISTORY_LOG_FILE)
+    shard_parser.set_defaults(func=run_shard)
+
+    args = parser.parse_args(argv)
+    if args.command is None:
+        root = tk.Tk()
+        app = ModernBMICalculator(root, store=CachedStore(open_store(args.gui_backend)))
+        root.mainloop()
+    else:
+        args.func(args)
+
+
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = ModernBMICalculator(root)
-    root.mainloop()
\ No newline at end of file
+    main()
\ No newline at end of file
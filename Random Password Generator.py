@@ -6,21 +6,1020 @@ A comprehensive password generator with Tkinter GUI featuring:
 - Clipboard integration
 - Character exclusion options
 - Password strength indicator
+- Uniform sampling over exactly the passwords that meet the rules
+- Headless bulk export to stdout or a file (the "export" command)
+- Diceware-style passphrases from indexed wordlists
+- Offline breached-password check against a Bloom filter (the "breach-index" command)
 """
 
 import tkinter as tk
 from tkinter import ttk, messagebox
+import argparse
+import csv
+import hashlib
+import io
+import json
+import math
+import mmap
+import os
+import struct
+import sys
 import random
 import string
+import time
 import pyperclip
 import re
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from bisect import bisect_right
+from itertools import islice
+
+# NumPy is only needed for VectorizedPasswordGenerator, so it is imported on
+# first use by import_numpy() and the GUI starts without it.
+np = None
+
+AMBIGUOUS_CHARS = "il1Lo0O"
+SIMILAR_CHARS = "il1Lo0O|`"
+PARALLEL_CHUNK_SIZE = 64 * 1024  # Passwords per task handed to a worker process
+EXPORT_BATCH_SIZE = 8192         # Records joined into each write() by the export pipeline
+BREACH_FILTER_FILE = "breached_passwords.bloom"  # Loaded by the GUI when present
+BREACH_FALSE_POSITIVE_RATE = 0.001
+BREACH_RETRIES = 1000            # Draws before the GUI gives up finding an unbreached password
+MAX_PASSWORD_LENGTH = 512
+PASSPHRASE_WORDLIST_FILE = "wordlist.txt"
+PASSPHRASE_WORDS = 6
+PASSPHRASE_SEPARATOR = "-"
+
+# (policy attribute, minimum attribute, characters) per character class
+CHARACTER_CLASSES = (
+    ("uppercase", "min_uppercase", string.ascii_uppercase),
+    ("lowercase", "min_lowercase", string.ascii_lowercase),
+    ("digits", "min_digits", string.digits),
+    ("symbols", "min_symbols", string.punctuation),
+)
+
+
+def import_numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
+
+
+@dataclass(frozen=True)
+class PasswordPolicy:
+    """Immutable snapshot of the password generation settings"""
+    length: int = 16
+    uppercase: bool = True
+    lowercase: bool = True
+    digits: bool = True
+    symbols: bool = True
+    exclude_ambiguous: bool = False
+    exclude_similar: bool = False
+    exclude_custom: str = ""
+    min_uppercase: int = 1
+    min_lowercase: int = 1
+    min_digits: int = 1
+    min_symbols: int = 1
+    enforce_rules: bool = True
+
+    def validate(self):
+        """Raise ValueError if no password can be generated for this policy"""
+        if not any([self.uppercase, self.lowercase, self.digits, self.symbols]):
+            raise ValueError("Please select at least one character type!")
+
+        if self.enforce_rules:
+            min_total = (self.min_uppercase + self.min_lowercase +
+                         self.min_digits + self.min_symbols)
+            if min_total > self.length:
+                raise ValueError(
+                    f"Minimum character requirements ({min_total}) exceed password length ({self.length})!")
+
+        if self.length < 4:
+            raise ValueError("Password length must be at least 4 characters!")
+        if self.length > MAX_PASSWORD_LENGTH:
+            raise ValueError(f"Password length must be at most {MAX_PASSWORD_LENGTH} characters!")
+
+        for name, (chars, minimum) in self.named_class_pools().items():
+            if minimum > 0 and not chars:
+                raise ValueError(
+                    f"Exclusions leave no characters in the {name} class to meet the minimum of {minimum}!")
+
+    def pool_options(self):
+        """The settings that decide the character pool (everything but length)"""
+        return tuple(getattr(self, name) for name in POOL_OPTION_NAMES)
+
+    def excluded_characters(self):
+        """Characters removed from the pool by the exclusion options"""
+        excluded = set(self.exclude_custom)
+        if self.exclude_ambiguous:
+            excluded.update(AMBIGUOUS_CHARS)
+        if self.exclude_similar:
+            excluded.update(SIMILAR_CHARS)
+        return excluded
+
+    def compiled(self):
+        """The CompiledPool for this policy, shared by every equal policy"""
+        return compile_pool(self.pool_options())
+
+    def class_pools(self):
+        """(available characters, minimum count) for each enabled character class"""
+        return list(self.compiled().classes)
+
+    def named_class_pools(self):
+        """{class name: (available characters, minimum count)} for each enabled class"""
+        enabled = (name for name, _, _ in CHARACTER_CLASSES if getattr(self, name))
+        return dict(zip(enabled, self.compiled().classes))
+
+    def character_pool(self):
+        """All characters a password may contain under this policy"""
+        return self.compiled().pool
+
+
+# Field names matching PasswordPolicy.pool_options(), in order
+POOL_OPTION_NAMES = tuple(f.name for f in fields(PasswordPolicy) if f.name != "length")
+
+
+@dataclass(frozen=True)
+class CompiledPool:
+    """Character pool and per-class sub-pools, worked out once per set of options"""
+    pool: str
+    classes: tuple  # ((available characters, minimum count), ...) per enabled class
+
+
+@lru_cache(maxsize=64)
+def compile_pool(options):
+    """Build the CompiledPool for a PasswordPolicy.pool_options() tuple
+
+    Cached on the options tuple, so the pool is only rebuilt when a setting
+    that affects it changes.
+    """
+    policy = PasswordPolicy(**dict(zip(POOL_OPTION_NAMES, options)))
+    deletions = str.maketrans("", "", ''.join(policy.excluded_characters()))
+    classes = tuple(
+        (chars.translate(deletions), getattr(policy, min_attr) if policy.enforce_rules else 0)
+        for enabled_attr, min_attr, chars in CHARACTER_CLASSES
+        if getattr(policy, enabled_attr)
+    )
+    return CompiledPool(pool=''.join(chars for chars, _ in classes), classes=classes)
+
+
+class SecureRandomSource:
+    """Cryptographically secure draws from os.urandom, read in large blocks
+
+    Random bytes are mapped onto a range of n values by rejection sampling:
+    bytes at or above the largest multiple of n that fits in a byte are
+    dropped, and the rest are reduced mod n, so every value is equally
+    likely. Both steps are a single bytes.translate() call, so the cost per
+    drawn value stays at C speed.
+    """
+
+    BLOCK_SIZE = 64 * 1024
+
+    def __init__(self):
+        self._buffer = b""
+        self._offset = 0
+        self._pid = None
+        self._tables = {}
+
+    def random_bytes(self, n):
+        """Return n random bytes, served from a buffered os.urandom block"""
+        if n >= self.BLOCK_SIZE:
+            return os.urandom(n)
+        # A forked child must never replay its parent's buffered bytes
+        if self._offset + n > len(self._buffer) or self._pid != os.getpid():
+            self._buffer = os.urandom(self.BLOCK_SIZE)
+            self._offset = 0
+            self._pid = os.getpid()
+        # Advancing an offset keeps small draws from copying the rest of the block
+        data = self._buffer[self._offset:self._offset + n]
+        self._offset += n
+        return data
+
+    def choices(self, chars, k):
+        """Return a string of k characters drawn uniformly from chars (ASCII, at most 256)"""
+        return self._draw(chars, k).decode("ascii")
+
+    def below(self, n, k):
+        """Return k uniform integers in range(n), as bytes when n <= 256, else as a list"""
+        if n > 256:
+            return [self.randbelow(n) for _ in range(k)]
+        return self._draw(n, k)
+
+    def randbelow(self, n):
+        """Return one uniform integer in range(n), for any n >= 1"""
+        bits = (n - 1).bit_length()
+        size, mask = (bits + 7) // 8, (1 << bits) - 1
+        while True:
+            # Masking to the bit length of n - 1 rejects fewer than half the draws
+            value = int.from_bytes(self.random_bytes(size), "little") & mask
+            if value < n:
+                return value
+
+    def _draw(self, alphabet, k):
+        table, rejected, limit = self._table(alphabet)
+        out = b""
+        while len(out) < k:
+            needed = k - len(out)
+            # Expected bytes per accepted value is 256 / limit; over-draw a little
+            out += self.random_bytes(needed * 256 // limit + 16).translate(table, rejected)
+        return out[:k]
+
+    def _table(self, alphabet):
+        cached = self._tables.get(alphabet)
+        if cached is None:
+            values = alphabet.encode("ascii") if isinstance(alphabet, str) else bytes(range(alphabet))
+            n = len(values)
+            if not 0 < n <= 256:
+                raise ValueError("SecureRandomSource can only draw from 1 to 256 values")
+            limit = 256 - 256 % n
+            table = bytes(values[b % n] if b < limit else 0 for b in range(256))
+            cached = self._tables[alphabet] = (table, bytes(range(limit, 256)), limit)
+        return cached
+
+
+class MersenneRandomSource:
+    """Same interface as SecureRandomSource, backed by the random module
+
+    Faster, but the Mersenne Twister is predictable and not suitable for
+    real credentials.
+    """
+
+    def choices(self, chars, k):
+        return ''.join(random.choices(chars, k=k))
+
+    def below(self, n, k):
+        return random.choices(range(n), k=k)
+
+    def random_bytes(self, n):
+        return random.randbytes(n)
+
+    def randbelow(self, n):
+        return random.randrange(n)
+
+
+class PasswordGenerator:
+    """Generate passwords for a fixed policy, independent of the GUI
+
+    The pool and per-class requirements are worked out once in the
+    constructor, and generate() draws the random characters for a whole
+    batch of passwords at a time. With ``secure=True`` (the default) every
+    draw, including the placement of the required characters, comes from
+    SecureRandomSource. The output is not uniform over the passwords the
+    policy allows; ExactPasswordGenerator is.
+    """
+
+    BATCH_SIZE = 1024
+
+    def __init__(self, policy, secure=True):
+        policy.validate()
+        self.policy = policy
+        self.random = SecureRandomSource() if secure else MersenneRandomSource()
+        self.length = policy.length
+        compiled = policy.compiled()
+        self.pool = compiled.pool
+        if not self.pool:
+            raise ValueError("No characters available for password generation!")
+
+        # Same rules as the GUI has always applied: a minimum is capped at the
+        # number of distinct characters left in its class
+        self.required = [
+            (chars, min(minimum, len(chars)))
+            for chars, minimum in compiled.classes
+            if chars and minimum > 0
+        ]
+        self.fill_length = max(self.length - sum(k for _, k in self.required), 0)
+
+    def generate_one(self):
+        """Return a single password"""
+        return next(self.generate(1))
+
+    def generate(self, count):
+        """Yield ``count`` passwords"""
+        source, length, fill_length = self.random, self.length, self.fill_length
+        required_total = sum(k for _, k in self.required)
+        while count > 0:
+            batch = min(count, self.BATCH_SIZE)
+            count -= batch
+
+            # One draw per class and one for the fill, per batch
+            required = [(source.choices(chars, k * batch), k) for chars, k in self.required]
+            fill = source.choices(self.pool, fill_length * batch)
+            # Insertion slots: the j-th required character goes into a list
+            # that already holds fill_length + j characters
+            slots = [source.below(fill_length + j + 1, batch) for j in range(required_total)]
+
+            for i in range(batch):
+                # The fill characters are independent and identically
+                # distributed, so dropping each required character into a
+                # uniformly random slot is equivalent to shuffling the whole
+                # password, at a fraction of the cost
+                password = list(fill[i * fill_length:(i + 1) * fill_length])
+                j = 0
+                for drawn, k in required:
+                    for c in drawn[i * k:(i + 1) * k]:
+                        password.insert(slots[j][i], c)
+                        j += 1
+                yield ''.join(password[:length])
+
+
+class ExactPasswordGenerator(PasswordGenerator):
+    """Sample uniformly from exactly the passwords that satisfy the policy
+
+    PasswordGenerator places the required characters first and caps each
+    minimum at the size of its class, so passwords with extra characters
+    from a small class are over-represented. Here every string of the
+    policy's length over the pool that meets every minimum is equally
+    likely, and nothing is truncated.
+
+    The valid set is counted exactly: W[c][r], the number of ways to fill r
+    positions from classes c onwards while meeting their minimums, sums
+    C(r, n) * size**n * W[c + 1][r - n] over the n positions class c takes.
+    When valid passwords make up at least REJECTION_THRESHOLD of all strings
+    over the pool (true of typical policies), it is cheapest to draw
+    uniform strings and drop the ones that miss a minimum, which leaves the
+    rest exactly uniform. Otherwise each password draws one integer below
+    the total, which picks the per-class counts by walking the cumulative
+    weights; the characters of each class and their positions are then
+    drawn uniformly.
+    """
+
+    REJECTION_THRESHOLD = 0.05
+    ACCEPTANCE_SAMPLES = 4096  # Candidates drawn to estimate the acceptance rate
+
+    def __init__(self, policy, secure=True):
+        super().__init__(policy, secure)
+        self.classes = [(chars, minimum) for chars, minimum in policy.compiled().classes if chars]
+
+        # Each pool character maps to a one-character code for its class, so
+        # a minimum is checked with one str.count per class
+        self.class_codes = str.maketrans(
+            {ch: chr(c + 1) for c, (chars, _) in enumerate(self.classes) for ch in chars})
+        self.checks = [(chr(c + 1), minimum) for c, (_, minimum) in enumerate(self.classes) if minimum]
+
+        # The counting tables cost O(classes * length**2) big-integer terms,
+        # so they are only built when rejection would be too slow; a sampled
+        # estimate of the acceptance rate decides which path to take
+        self.weights = self.cumulative = self.total = None
+        self.acceptance = self._estimate_acceptance()
+        self.use_rejection = self.acceptance >= self.REJECTION_THRESHOLD
+        if not self.use_rejection:
+            self._build_tables()
+
+    def _estimate_acceptance(self):
+        if not self.checks:
+            return 1.0
+        length, samples = self.length, self.ACCEPTANCE_SAMPLES
+        codes = self.random.choices(self.pool, samples * length).translate(self.class_codes)
+        accepted = sum(
+            all(codes.count(code, i, i + length) >= minimum for code, minimum in self.checks)
+            for i in range(0, len(codes), length)
+        )
+        return accepted / samples
+
+    def _build_tables(self):
+        """Work out the exact weights and cumulative tables for the counting path"""
+        if self.cumulative is not None:
+            return
+        length = self.length
+        # weights[c][r] as above; cumulative[c][r][i] sums the terms for
+        # n = minimum .. minimum + i
+        weights = [[0] * (length + 1) for _ in range(len(self.classes) + 1)]
+        weights[-1][0] = 1
+        cumulative = [[None] * (length + 1) for _ in self.classes]
+        for c in reversed(range(len(self.classes))):
+            chars, minimum = self.classes[c]
+            for r in range(length + 1):
+                total, terms = 0, []
+                for n in range(minimum, r + 1):
+                    total += math.comb(r, n) * len(chars) ** n * weights[c + 1][r - n]
+                    terms.append(total)
+                weights[c][r], cumulative[c][r] = total, terms
+        self.weights, self.cumulative = weights, cumulative
+        self.total = weights[0][length]
+        self.acceptance = self.total / len(self.pool) ** length
+
+    def generate(self, count):
+        """Yield ``count`` passwords"""
+        if self.use_rejection:
+            return self._generate_rejection(count)
+        return self._generate_counted(count)
+
+    def _generate_rejection(self, count):
+        source, length, checks = self.random, self.length, self.checks
+        while count > 0:
+            # Enough candidates that one draw usually fills the batch
+            batch = min(count, self.BATCH_SIZE)
+            candidates = math.ceil(batch / self.acceptance) + 16
+            text = source.choices(self.pool, candidates * length)
+            codes = text.translate(self.class_codes)
+            for i in range(0, len(text), length):
+                block = codes[i:i + length]
+                if all(block.count(code) >= minimum for code, minimum in checks):
+                    yield text[i:i + length]
+                    count -= 1
+                    if count == 0:
+                        return
+
+    def _generate_counted(self, count):
+        self._build_tables()
+        source, length = self.random, self.length
+        while count > 0:
+            batch = min(count, self.BATCH_SIZE)
+            count -= batch
+
+            counts = [self._class_counts(source.randbelow(self.total)) for _ in range(batch)]
+            # One draw per class for the whole batch, consumed in order
+            drawn = [source.choices(chars, sum(row[c] for row in counts))
+                     for c, (chars, _) in enumerate(self.classes)]
+            offsets = [0] * len(self.classes)
+            # Inserting the j-th character at a uniform slot among j + 1
+            # gives a uniformly random arrangement
+            slots = [source.below(j + 1, batch) for j in range(length)]
+
+            for i, row in enumerate(counts):
+                password = []
+                j = 0
+                for c, n in enumerate(row):
+                    for ch in drawn[c][offsets[c]:offsets[c] + n]:
+                        password.insert(slots[j][i], ch)
+                        j += 1
+                    offsets[c] += n
+                yield ''.join(password)
+
+    def _class_counts(self, x):
+        """Map a uniform integer below self.total to per-class character counts"""
+        r, counts = self.length, []
+        for c, (_, minimum) in enumerate(self.classes):
+            cumulative = self.cumulative[c][r]
+            i = bisect_right(cumulative, x)
+            n = minimum + i
+            # What is left of x is uniform over this count's share of the
+            # total, and so, reduced, over the ways to fill the rest
+            x = (x - (cumulative[i - 1] if i else 0)) % self.weights[c + 1][r - n]
+            counts.append(n)
+            r -= n
+        return counts
+
+
+class VectorizedPasswordGenerator(ExactPasswordGenerator):
+    """ExactPasswordGenerator that builds each batch as one NumPy character matrix
+
+    On the rejection path a whole (N x length) matrix of pool indices is
+    drawn in one call and looked up with take(), the class minimums are
+    checked for every row at once through a code-to-class table, and the
+    surviving rows are turned into strings with a single view/astype
+    instead of per-character Python loops. Policies that need the counting
+    path fall back to ExactPasswordGenerator. Requires NumPy; the draws
+    come from the same source as PasswordGenerator.
+    """
+
+    BATCH_SIZE = 64 * 1024
+
+    def __init__(self, policy, secure=True):
+        import_numpy()
+        super().__init__(policy, secure)
+        self.pool_codes = np.frombuffer(self.pool.encode("ascii"), np.uint8)
+        # Class index per ASCII code (0 for characters outside the pool)
+        self.class_of = np.zeros(256, np.uint8)
+        for c, (chars, _) in enumerate(self.classes):
+            self.class_of[np.frombuffer(chars.encode("ascii"), np.uint8)] = c + 1
+        self.matrix_checks = [(c + 1, minimum) for c, (_, minimum) in enumerate(self.classes) if minimum]
+
+    def _indices(self, n, shape):
+        """Uniform integers in range(n) as a uint8 array of ``shape``"""
+        size = shape[0] * shape[1]
+        return np.frombuffer(bytes(self.random.below(n, size)), np.uint8).reshape(shape)
+
+    def generate_matrix(self, count):
+        """Return ``count`` passwords as a (count, length) uint8 array of ASCII codes"""
+        if not self.use_rejection:
+            text = ''.join(ExactPasswordGenerator.generate(self, count))
+            return np.frombuffer(text.encode("ascii"), np.uint8).reshape(count, self.length)
+        rows, needed = [], count
+        while needed > 0:
+            candidates = math.ceil(needed / self.acceptance) + 16
+            matrix = self.pool_codes.take(self._indices(len(self.pool_codes), (candidates, self.length)))
+            classes = self.class_of.take(matrix)
+            valid = np.ones(candidates, bool)
+            for code, minimum in self.matrix_checks:
+                valid &= (classes == code).sum(axis=1) >= minimum
+            accepted = matrix[valid][:needed]
+            rows.append(accepted)
+            needed -= len(accepted)
+        return np.concatenate(rows)
+
+    def generate(self, count):
+        """Yield ``count`` passwords"""
+        if not self.use_rejection:
+            yield from ExactPasswordGenerator.generate(self, count)
+            return
+        length = self.length
+        while count > 0:
+            batch = min(count, self.BATCH_SIZE)
+            count -= batch
+            matrix = self.generate_matrix(batch)
+            yield from matrix.view(f"S{length}").ravel().astype(f"U{length}").tolist()
+
+
+# Generator built by each worker process of generate_parallel(), keyed on its arguments
+_worker_generator = None
+
+
+def _init_worker():
+    # Forked workers inherit the parent's Mersenne Twister state; reseed so
+    # secure=False workers do not all produce the same stream. Secure
+    # workers need nothing: SecureRandomSource refills from os.urandom in
+    # each process.
+    random.seed(os.urandom(32))
+
+
+def _generate_chunk(task):
+    """Worker: return ``count`` passwords as one newline-terminated string"""
+    global _worker_generator
+    policy, count, secure, generator_class = task
+    key = (policy, secure, generator_class)
+    if _worker_generator is None or _worker_generator[0] != key:
+        _worker_generator = (key, generator_class(policy, secure=secure))
+    passwords = _worker_generator[1].generate(count)
+    return ''.join(password + "\n" for password in passwords)
+
+
+def generate_parallel(policy, count, workers=None, secure=True,
+                      generator_class=None, chunk_size=PARALLEL_CHUNK_SIZE):
+    """Yield ``count`` passwords as newline-terminated text blocks, generated in parallel
+
+    The job is cut into chunks of ``chunk_size`` passwords that a process
+    pool of ``workers`` processes (default: one per CPU) works through.
+    Blocks come back in submission order, and only a few chunks per worker
+    are in flight at once, so memory stays flat however large ``count`` is
+    and a slow writer simply holds the workers back. Passing each chunk
+    back as one string keeps pickling cost per password negligible.
+    """
+    from collections import deque
+    from multiprocessing import Pool
+
+    if generator_class is None:
+        generator_class = _bulk_generator_class()
+    policy.validate()
+    workers = workers or os.cpu_count() or 1
+    tasks = ((policy, min(chunk_size, count - start), secure, generator_class)
+             for start in range(0, count, chunk_size))
+    with Pool(workers, initializer=_init_worker) as pool:
+        in_flight = deque()
+        for task in tasks:
+            in_flight.append(pool.apply_async(_generate_chunk, (task,)))
+            if len(in_flight) >= 2 * workers:
+                yield in_flight.popleft().get()
+        while in_flight:
+            yield in_flight.popleft().get()
+
+
+def write_parallel(policy, count, file, workers=None, secure=True):
+    """Write ``count`` passwords, one per line, to ``file`` using generate_parallel()"""
+    for block in generate_parallel(policy, count, workers, secure):
+        file.write(block)
+
+
+def _bulk_generator_class():
+    """VectorizedPasswordGenerator when NumPy is installed, else ExactPasswordGenerator"""
+    try:
+        import_numpy()
+    except ImportError:
+        return ExactPasswordGenerator
+    return VectorizedPasswordGenerator
+
+
+def benchmark_parallel(policy, count, workers=None, secure=True):
+    """Return passwords per second for generate_parallel() writing to a null sink"""
+    with open(os.devnull, "w") as sink:
+        start = time.perf_counter()
+        write_parallel(policy, count, sink, workers, secure)
+        return count / (time.perf_counter() - start)
+
+
+def benchmark_generator(policy, count, secure=True, generator_class=PasswordGenerator):
+    """Return passwords generated per second for ``policy``"""
+    generator = generator_class(policy, secure=secure)
+    start = time.perf_counter()
+    for _ in generator.generate(count):
+        pass
+    return count / (time.perf_counter() - start)
+
+
+# Strength level by entropy: (minimum bits, label, color), strongest first
+STRENGTH_LEVELS = (
+    (80, "Very Strong", "green"),
+    (60, "Strong", "blue"),
+    (36, "Medium", "orange"),
+    (0, "Weak", "red"),
+)
+
+# Every ASCII character maps to the code of its class (whitespace and control
+# characters share "other"); non-ASCII characters pass through unchanged and
+# add one to the pool each
+CLASS_CODES = {"uppercase": "\x01", "lowercase": "\x02", "digits": "\x03",
+               "symbols": "\x04", "other": "\x05"}
+
+
+class BreachedPasswordFilter:
+    """Bloom filter of known-breached passwords, memory-mapped from disk
+
+    Built once from a plain wordlist (one password per line) by build(). The
+    file is a small header followed by the bit array, so open() maps it and
+    a lookup touches only ``hash_count`` bits, whatever the list size: a
+    500M-entry list at a 0.1% false-positive rate is about 860 MiB on disk,
+    read lazily by the OS. There are no false negatives; a false positive
+    only costs the generator one extra draw.
+    """
+
+    MAGIC = b"PWBLOOM1"
+    HEADER = struct.Struct("<8sQIQ")  # magic, bit count, hash count, entries
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.bit_count, self.hash_count, self.entries = self.HEADER.unpack_from(self._map)
+        if magic != self.MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a breached-password filter")
+
+    @classmethod
+    def build(cls, wordlist_path, path, false_positive_rate=BREACH_FALSE_POSITIVE_RATE):
+        """Compile ``wordlist_path`` into a filter file at ``path`` and open it"""
+        with open(wordlist_path, "rb") as wordlist:
+            entries = sum(1 for line in wordlist if line.strip(b"\r\n"))
+        bit_count = max(64, math.ceil(-entries * math.log(false_positive_rate) / math.log(2) ** 2))
+        hash_count = max(1, round(bit_count / max(entries, 1) * math.log(2)))
+
+        with open(path, "wb") as file:
+            file.write(cls.HEADER.pack(cls.MAGIC, bit_count, hash_count, entries))
+            file.truncate(cls.HEADER.size + (bit_count + 7) // 8)
+        # Bits are set through a writable mapping, so building a large filter
+        # leans on the page cache rather than holding the array in memory
+        with open(path, "r+b") as file, mmap.mmap(file.fileno(), 0) as bits, \
+                open(wordlist_path, "rb") as wordlist:
+            offset = cls.HEADER.size
+            for line in wordlist:
+                word = line.rstrip(b"\r\n")
+                if word:
+                    for position in cls._positions(word, bit_count, hash_count):
+                        bits[offset + (position >> 3)] |= 1 << (position & 7)
+        return cls(path)
+
+    @staticmethod
+    def _positions(word, bit_count, hash_count):
+        # Double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(word, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % bit_count for i in range(hash_count)]
+
+    def __contains__(self, password):
+        bits, offset = self._map, self.HEADER.size
+        return all(
+            bits[offset + (position >> 3)] & (1 << (position & 7))
+            for position in self._positions(password.encode("utf-8"), self.bit_count, self.hash_count)
+        )
+
+    def close(self):
+        self._map.close()
+
+
+class WordListIndex:
+    """Random access to the words of a large wordlist through an offset index
+
+    The wordlist is one word per line; diceware lists ("11111<TAB>abacus")
+    work too, since only the last field of a line is used. The first open
+    writes ``<wordlist>.idx``, a header plus one little-endian uint64 start
+    offset per word, and later opens just map both files, so a 1M-word list
+    is ready at once and word(i) is O(1). The index is rebuilt when the
+    wordlist's size or modification time no longer match its header.
+    """
+
+    MAGIC = b"PWWORDS1"
+    HEADER = struct.Struct("<8sQQd")  # magic, word count, wordlist size, wordlist mtime
+    OFFSET = struct.Struct("<Q")
+
+    def __init__(self, wordlist_path):
+        self.wordlist_path = wordlist_path
+        self.index_path = wordlist_path + ".idx"
+        stat = os.stat(wordlist_path)
+        if not self._index_matches(stat):
+            self._build_index(stat)
+        with open(wordlist_path, "rb") as file:
+            self._words = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(self.index_path, "rb") as file:
+            self._index = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.count = self.HEADER.unpack_from(self._index)[1]
+        self._admissible = {}
+
+    def _index_matches(self, stat):
+        try:
+            with open(self.index_path, "rb") as file:
+                magic, _, size, mtime = self.HEADER.unpack(file.read(self.HEADER.size))
+        except (OSError, struct.error):
+            return False
+        return magic == self.MAGIC and size == stat.st_size and mtime == stat.st_mtime
+
+    def _build_index(self, stat):
+        offsets = []
+        position = 0
+        with open(self.wordlist_path, "rb") as file:
+            for line in file:
+                if line.strip():
+                    offsets.append(position)
+                position += len(line)
+        with open(self.index_path, "wb") as file:
+            file.write(self.HEADER.pack(self.MAGIC, len(offsets), stat.st_size, stat.st_mtime))
+            file.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+
+    def word(self, i):
+        """Return the i-th word"""
+        start = self.OFFSET.unpack_from(self._index, self.HEADER.size + i * self.OFFSET.size)[0]
+        end = self._words.find(b"\n", start)
+        line = self._words[start:end if end != -1 else len(self._words)]
+        return line.split()[-1].decode("utf-8")
+
+    def admissible_count(self, excluded, capitalize=False):
+        """Number of words (first letter upper-cased if asked) free of every ``excluded`` character
+
+        Needs one pass over the list per exclusion set, so both counts are
+        worked out together and cached.
+        """
+        key = frozenset(excluded)
+        if key not in self._admissible:
+            plain = capital = self.count
+            if excluded:
+                search = re.compile(f"[{re.escape(''.join(excluded))}]").search
+                plain = capital = 0
+                for line in self._words[:].decode("utf-8").splitlines():
+                    fields = line.split()
+                    if fields:
+                        word = fields[-1]
+                        # Capitalizing only changes the first character
+                        if search(word, 1) is None:
+                            plain += word[0] not in excluded
+                            capital += word[0].upper() not in excluded
+            self._admissible[key] = (plain, capital)
+        return self._admissible[key][capitalize]
+
+    def close(self):
+        self._words.close()
+        self._index.close()
+
+
+class PassphraseGenerator:
+    """Generate diceware-style passphrases from a WordListIndex
+
+    Words are drawn uniformly with the generator's random source, and words
+    containing a character excluded by the policy are redrawn. With
+    enforce_rules, the first min_uppercase words are capitalized and
+    min_digits digits plus min_symbols symbols (from the policy's sub-pools)
+    are appended as one extra token. ``entropy`` counts only the word and
+    token draws, so it never overstates the strength.
+    """
+
+    def __init__(self, words, policy=PasswordPolicy(), word_count=PASSPHRASE_WORDS,
+                 separator=PASSPHRASE_SEPARATOR, secure=True):
+        if word_count < 1:
+            raise ValueError("A passphrase needs at least one word!")
+        self.words, self.policy = words, policy
+        self.word_count, self.separator = word_count, separator
+        self.random = SecureRandomSource() if secure else MersenneRandomSource()
+        self.excluded = policy.excluded_characters()
+        if not self.excluded.isdisjoint(separator):
+            raise ValueError("The separator uses an excluded character!")
+
+        rules = policy.named_class_pools() if policy.enforce_rules else {}
+        self.capitalized = min(word_count, policy.min_uppercase) \
+            if policy.uppercase and policy.enforce_rules else 0
+        self.tail = [(chars, k) for name, (chars, k) in rules.items()
+                     if name in ("digits", "symbols") and chars and k > 0]
+
+        plain = words.admissible_count(self.excluded)
+        capital = words.admissible_count(self.excluded, capitalize=True) if self.capitalized else plain
+        if not plain or not capital:
+            raise ValueError("No words in the list are free of the excluded characters!")
+        self.entropy = ((word_count - self.capitalized) * math.log2(plain) +
+                        self.capitalized * math.log2(capital) +
+                        sum(k * math.log2(len(chars)) for chars, k in self.tail))
+
+    def _draw_word(self, capitalize):
+        while True:
+            word = self.words.word(self.random.randbelow(self.words.count))
+            if capitalize:
+                word = word[:1].upper() + word[1:]
+            if self.excluded.isdisjoint(word):
+                return word
+
+    def generate_one(self):
+        """Return a single passphrase"""
+        tokens = [self._draw_word(i < self.capitalized) for i in range(self.word_count)]
+        if self.tail:
+            tokens.append(''.join(self.random.choices(chars, k) for chars, k in self.tail))
+        return self.separator.join(tokens)
+
+    def generate(self, count):
+        """Yield ``count`` passphrases"""
+        for _ in range(count):
+            yield self.generate_one()
+
+
+def _class_table():
+    table = {ord(c): CLASS_CODES[name] for name, _, chars in CHARACTER_CLASSES for c in chars}
+    table.update((i, CLASS_CODES["other"]) for i in range(128) if i not in table)
+    return table
+
+
+CLASS_TABLE = _class_table()
+CLASS_CODE_SIZES = {
+    CLASS_CODES["uppercase"]: len(string.ascii_uppercase),
+    CLASS_CODES["lowercase"]: len(string.ascii_lowercase),
+    CLASS_CODES["digits"]: len(string.digits),
+    CLASS_CODES["symbols"]: len(string.punctuation),
+    CLASS_CODES["other"]: 128 - len(string.ascii_letters + string.digits + string.punctuation),
+}
+CLASS_CODE_SET = frozenset(CLASS_CODE_SIZES)
+
+
+def password_strength(password, pool_size=None):
+    """Return (entropy in bits, strength label, color) for ``password``
+
+    The entropy is length * log2(pool size). When the pool is not known (a
+    candidate from outside the generator) it is estimated as the combined
+    size of every character class the password uses, found with one
+    translate() pass. Caching is keyed on the class set and length rather
+    than the password, so an audit never keeps plaintext in memory.
+    """
+    if pool_size is None:
+        # CLASS_TABLE only covers ASCII, so anything else survives translate()
+        # as itself; each distinct such character adds one to the pool
+        found = set(password.translate(CLASS_TABLE))
+        codes = CLASS_CODE_SET.intersection(found)
+        pool_size = _pool_size(codes) + len(found) - len(codes)
+    return _strength(len(password), pool_size)
+
+
+@lru_cache(maxsize=None)
+def _pool_size(codes):
+    # At most one entry per combination of the five class codes
+    return sum(CLASS_CODE_SIZES[code] for code in codes)
+
+
+@lru_cache(maxsize=4096)
+def _strength(length, pool_size):
+    bits = length * math.log2(pool_size) if pool_size > 1 else 0.0
+    return (bits,) + strength_level(bits)
+
+
+def strength_level(bits):
+    """Return the (strength label, color) for an entropy of ``bits``"""
+    for minimum, strength, color in STRENGTH_LEVELS:
+        if bits >= minimum:
+            return strength, color
+
+
+def score_passwords(passwords, pool_size=None):
+    """Yield (password, entropy in bits, strength label) for each password"""
+    for password in passwords:
+        bits, strength, _ = password_strength(password, pool_size)
+        yield password, bits, strength
+
+
+def policy_violations(password, policy):
+    """Return the ways ``password`` falls short of ``policy`` (empty if it complies)"""
+    problems = []
+    if len(password) < policy.length:
+        problems.append("too short")
+    codes = password.translate(CLASS_TABLE)
+    for name, min_attr, _ in CHARACTER_CLASSES:
+        if not getattr(policy, name):
+            if CLASS_CODES[name] in codes:
+                problems.append(f"contains {name}")
+        elif policy.enforce_rules and codes.count(CLASS_CODES[name]) < getattr(policy, min_attr):
+            problems.append(f"too few {name}")
+    if not policy.excluded_characters().isdisjoint(password):
+        problems.append("contains excluded characters")
+    return problems
+
+
+def audit_passwords(passwords, policy, breached=None):
+    """Score ``passwords`` and check them against ``policy``; return a summary dict
+
+    With a ``breached`` filter, passwords on the breach list are counted as
+    the "breached" violation.
+    """
+    levels = {strength: 0 for _, strength, _ in STRENGTH_LEVELS}
+    violations = {}
+    count = total_bits = 0
+    weakest = None
+    for password, bits, strength in score_passwords(passwords):
+        count += 1
+        total_bits += bits
+        levels[strength] += 1
+        if weakest is None or bits < weakest[1]:
+            weakest = (password, bits)
+        problems = policy_violations(password, policy)
+        if breached is not None and password in breached:
+            problems.append("breached")
+        for problem in problems:
+            violations[problem] = violations.get(problem, 0) + 1
+    return {
+        "count": count,
+        "mean_bits": total_bits / count if count else 0.0,
+        "weakest_bits": weakest[1] if weakest else 0.0,
+        "levels": levels,
+        "violations": violations,
+    }
+
+
+def iter_passwords(policy, count, workers=1, secure=True, breached=None):
+    """Yield ``count`` passwords, from one process or from generate_parallel()
+
+    Passwords found in the ``breached`` filter are dropped and replaced by
+    further draws.
+    """
+    if breached is not None:
+        candidates = iter_passwords(policy, sys.maxsize, workers, secure)
+        yield from islice((p for p in candidates if p not in breached), count)
+    elif workers == 1:
+        yield from _bulk_generator_class()(policy, secure=secure).generate(count)
+    else:
+        for block in generate_parallel(policy, count, workers, secure):
+            yield from block.splitlines()
+
+
+def format_records(passwords, output_format, with_strength=False, pool_size=None):
+    """Yield output text for each password in ``output_format`` (text, csv or jsonl)
+
+    With ``with_strength`` each record carries the password's entropy in bits.
+    """
+    if output_format == "csv":
+        # Passwords may contain commas and quotes, so quote through the csv module
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(["password", "strength"] if with_strength else ["password"])
+        for password in passwords:
+            writer.writerow([password, _bits(password, pool_size)] if with_strength else [password])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    elif output_format == "jsonl":
+        for password in passwords:
+            record = {"password": password}
+            if with_strength:
+                record["strength"] = _bits(password, pool_size)
+            yield json.dumps(record) + "\n"
+    elif with_strength:
+        for password in passwords:
+            yield f"{password}\t{_bits(password, pool_size)}\n"
+    else:
+        for password in passwords:
+            yield password + "\n"
+
+
+def _bits(password, pool_size):
+    return round(password_strength(password, pool_size)[0], 1)
+
+
+def write_buffered(chunks, file, batch_size=EXPORT_BATCH_SIZE):
+    """Write an iterable of text chunks to ``file``, ``batch_size`` at a time; return the count"""
+    written = 0
+    batch = []
+    for chunk in chunks:
+        batch.append(chunk)
+        if len(batch) >= batch_size:
+            file.write(''.join(batch))
+            written += len(batch)
+            batch.clear()
+    file.write(''.join(batch))
+    return written + len(batch)
+
+
+def export_passwords(policy, count, file, output_format="text", with_strength=False,
+                     workers=1, secure=True, breached=None):
+    """Stream ``count`` passwords for ``policy`` into ``file``; return the count
+
+    Every stage is a generator, so only one write batch (plus one chunk per
+    worker) is held in memory regardless of ``count``.
+    """
+    if output_format == "text" and not with_strength and workers != 1 and breached is None:
+        # Worker blocks are already newline-terminated text
+        write_parallel(policy, count, file, workers, secure)
+        return count
+    passwords = iter_passwords(policy, count, workers, secure, breached)
+    records = format_records(passwords, output_format, with_strength, len(policy.character_pool()))
+    return write_buffered(records, file)
 
 
 class PasswordGeneratorGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("Advanced Password Generator")
-        self.root.geometry("600x700")
+        self.root.geometry("600x820")
         self.root.resizable(False, False)
         
         # Configure style
@@ -42,10 +1041,26 @@ class PasswordGeneratorGUI:
         self.min_digits_var = tk.IntVar(value=1)
         self.min_symbols_var = tk.IntVar(value=1)
         self.enforce_rules_var = tk.BooleanVar(value=True)
+        self.passphrase_var = tk.BooleanVar(value=False)
+        self.passphrase_words_var = tk.IntVar(value=PASSPHRASE_WORDS)
+        self.wordlist_var = tk.StringVar(value=PASSPHRASE_WORDLIST_FILE)
         
         # Character sets
-        self.ambiguous_chars = "il1Lo0O"
-        self.similar_chars = "il1Lo0O|`"
+        self.ambiguous_chars = AMBIGUOUS_CHARS
+        self.similar_chars = SIMILAR_CHARS
+        
+        # Reused across clicks until a setting changes
+        self.generator = None
+        self.passphrase_generator = None
+        self.wordlists = {}  # Wordlist path -> WordListIndex
+        
+        # Local breach list, built with the breach-index command
+        self.breached = None
+        if os.path.exists(BREACH_FILTER_FILE):
+            try:
+                self.breached = BreachedPasswordFilter(BREACH_FILTER_FILE)
+            except (OSError, ValueError) as e:
+                messagebox.showwarning("Warning", f"Breach list not loaded: {e}")
         
         self.create_widgets()
         
@@ -126,9 +1141,23 @@ class PasswordGeneratorGUI:
         ttk.Entry(exclusion_frame, textvariable=self.exclude_custom_var, 
                  width=40).grid(row=3, column=0, sticky=(tk.W, tk.E))
         
+        # Passphrase Section
+        passphrase_frame = ttk.LabelFrame(main_frame, text="Passphrase", padding="10")
+        passphrase_frame.grid(row=5, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 10))
+        
+        ttk.Checkbutton(passphrase_frame, text="Generate a passphrase from a wordlist", 
+                       variable=self.passphrase_var).grid(row=0, column=0, columnspan=2, 
+                                                          sticky=tk.W, pady=(0, 5))
+        ttk.Label(passphrase_frame, text="Words:").grid(row=1, column=0, sticky=tk.W)
+        ttk.Spinbox(passphrase_frame, from_=3, to=20, textvariable=self.passphrase_words_var, 
+                   width=10).grid(row=1, column=1, sticky=tk.W, padx=(10, 0))
+        ttk.Label(passphrase_frame, text="Wordlist:").grid(row=2, column=0, sticky=tk.W)
+        ttk.Entry(passphrase_frame, textvariable=self.wordlist_var, 
+                 width=40).grid(row=2, column=1, sticky=(tk.W, tk.E), padx=(10, 0))
+        
         # Generated Password Section
         password_frame = ttk.LabelFrame(main_frame, text="Generated Password", padding="10")
-        password_frame.grid(row=5, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 10))
+        password_frame.grid(row=6, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 10))
         
         password_entry = ttk.Entry(password_frame, textvariable=self.password_var, 
                                    font=('Courier', 12), state='readonly', width=50)
@@ -141,7 +1170,7 @@ class PasswordGeneratorGUI:
         
         # Buttons
         button_frame = ttk.Frame(main_frame)
-        button_frame.grid(row=6, column=0, columnspan=2, pady=(10, 0))
+        button_frame.grid(row=7, column=0, columnspan=2, pady=(10, 0))
         
         generate_btn = ttk.Button(button_frame, text="Generate Password", 
                                  command=self.generate_password, width=20)
@@ -155,115 +1184,71 @@ class PasswordGeneratorGUI:
                               command=self.clear_password, width=20)
         clear_btn.grid(row=0, column=2, padx=5)
         
-    def validate_settings(self):
-        """Validate user settings before generating password"""
-        # Check if at least one character type is selected
-        if not any([self.uppercase_var.get(), self.lowercase_var.get(), 
-                   self.digits_var.get(), self.symbols_var.get()]):
-            messagebox.showerror("Error", "Please select at least one character type!")
-            return False
-        
-        # Check if minimum requirements exceed password length
-        if self.enforce_rules_var.get():
-            min_total = (self.min_uppercase_var.get() + self.min_lowercase_var.get() + 
-                        self.min_digits_var.get() + self.min_symbols_var.get())
-            
-            if min_total > self.length_var.get():
-                messagebox.showerror("Error", 
-                    f"Minimum character requirements ({min_total}) exceed password length ({self.length_var.get()})!")
-                return False
-        
-        # Check if password length is valid
-        if self.length_var.get() < 4:
-            messagebox.showerror("Error", "Password length must be at least 4 characters!")
-            return False
+    def current_policy(self):
+        """Snapshot the current GUI settings as a PasswordPolicy"""
+        return PasswordPolicy(
+            length=self.length_var.get(),
+            uppercase=self.uppercase_var.get(),
+            lowercase=self.lowercase_var.get(),
+            digits=self.digits_var.get(),
+            symbols=self.symbols_var.get(),
+            exclude_ambiguous=self.exclude_ambiguous_var.get(),
+            exclude_similar=self.exclude_similar_var.get(),
+            exclude_custom=self.exclude_custom_var.get(),
+            min_uppercase=self.min_uppercase_var.get(),
+            min_lowercase=self.min_lowercase_var.get(),
+            min_digits=self.min_digits_var.get(),
+            min_symbols=self.min_symbols_var.get(),
+            enforce_rules=self.enforce_rules_var.get(),
+        )
+
+    def generate_passphrase(self):
+        """Generate a passphrase from the chosen wordlist"""
+        policy = self.current_policy()
+        path, word_count = self.wordlist_var.get(), self.passphrase_words_var.get()
+        generator = self.passphrase_generator
+        if (generator is None or generator.policy != policy or
+                generator.words.wordlist_path != path or generator.word_count != word_count):
+            try:
+                if path not in self.wordlists:
+                    self.wordlists[path] = WordListIndex(path)
+                self.passphrase_generator = PassphraseGenerator(
+                    self.wordlists[path], policy, word_count)
+            except (OSError, ValueError) as e:
+                self.passphrase_generator = None
+                messagebox.showerror("Error", f"Cannot generate a passphrase: {e}")
+                return
         
-        return True
-    
-    def get_character_pool(self):
-        """Build the character pool based on user selections"""
-        char_pool = ""
-        
-        if self.uppercase_var.get():
-            char_pool += string.ascii_uppercase
-        if self.lowercase_var.get():
-            char_pool += string.ascii_lowercase
-        if self.digits_var.get():
-            char_pool += string.digits
-        if self.symbols_var.get():
-            char_pool += string.punctuation
-        
-        # Remove excluded characters
-        if self.exclude_ambiguous_var.get():
-            char_pool = ''.join(c for c in char_pool if c not in self.ambiguous_chars)
-        
-        if self.exclude_similar_var.get():
-            char_pool = ''.join(c for c in char_pool if c not in self.similar_chars)
-        
-        # Remove custom excluded characters
-        custom_exclude = self.exclude_custom_var.get()
-        if custom_exclude:
-            char_pool = ''.join(c for c in char_pool if c not in custom_exclude)
-        
-        return char_pool
+        passphrase = self.passphrase_generator.generate_one()
+        self.password_var.set(passphrase)
+        self.update_strength_indicator(passphrase, self.passphrase_generator.entropy)
     
     def generate_password(self):
         """Generate a password based on user settings"""
-        if not self.validate_settings():
+        if self.passphrase_var.get():
+            self.generate_passphrase()
             return
         
-        char_pool = self.get_character_pool()
-        
-        if not char_pool:
-            messagebox.showerror("Error", "No characters available for password generation!")
-            return
+        policy = self.current_policy()
+        if self.generator is None or self.generator.policy != policy:
+            try:
+                self.generator = ExactPasswordGenerator(policy)
+            except ValueError as e:
+                self.generator = None
+                messagebox.showerror("Error", str(e))
+                return
         
-        password = []
-        
-        # Enforce minimum requirements if enabled
-        if self.enforce_rules_var.get():
-            # Add minimum uppercase
-            if self.uppercase_var.get() and self.min_uppercase_var.get() > 0:
-                available_upper = [c for c in string.ascii_uppercase if c in char_pool]
-                if available_upper:
-                    password.extend(random.choices(available_upper, 
-                                                  k=min(self.min_uppercase_var.get(), 
-                                                       len(available_upper))))
-            
-            # Add minimum lowercase
-            if self.lowercase_var.get() and self.min_lowercase_var.get() > 0:
-                available_lower = [c for c in string.ascii_lowercase if c in char_pool]
-                if available_lower:
-                    password.extend(random.choices(available_lower, 
-                                                  k=min(self.min_lowercase_var.get(), 
-                                                       len(available_lower))))
-            
-            # Add minimum digits
-            if self.digits_var.get() and self.min_digits_var.get() > 0:
-                available_digits = [c for c in string.digits if c in char_pool]
-                if available_digits:
-                    password.extend(random.choices(available_digits, 
-                                                  k=min(self.min_digits_var.get(), 
-                                                       len(available_digits))))
-            
-            # Add minimum symbols
-            if self.symbols_var.get() and self.min_symbols_var.get() > 0:
-                available_symbols = [c for c in string.punctuation if c in char_pool]
-                if available_symbols:
-                    password.extend(random.choices(available_symbols, 
-                                                  k=min(self.min_symbols_var.get(), 
-                                                       len(available_symbols))))
-        
-        # Fill remaining length with random characters from pool
-        remaining_length = self.length_var.get() - len(password)
-        if remaining_length > 0:
-            password.extend(random.choices(char_pool, k=remaining_length))
-        
-        # Shuffle the password to randomize positions
-        random.shuffle(password)
-        
-        # Convert to string
-        final_password = ''.join(password[:self.length_var.get()])
+        final_password = self.generator.generate_one()
+        if self.breached is not None:
+            # Reject and redraw anything on the breach list
+            for _ in range(BREACH_RETRIES):
+                if final_password not in self.breached:
+                    break
+                final_password = self.generator.generate_one()
+            else:
+                messagebox.showerror("Error", "Every password tried was on the breach list; "
+                                              "relax the settings and try again.")
+                return
         
         # Set the password
         self.password_var.set(final_password)
@@ -271,41 +1256,23 @@ class PasswordGeneratorGUI:
         # Update strength indicator
         self.update_strength_indicator(final_password)
     
-    def update_strength_indicator(self, password):
-        """Calculate and display password strength"""
-        strength_score = 0
-        
-        # Length scoring
-        if len(password) >= 12:
-            strength_score += 2
-        elif len(password) >= 8:
-            strength_score += 1
-        
-        # Character variety scoring
-        if re.search(r'[A-Z]', password):
-            strength_score += 1
-        if re.search(r'[a-z]', password):
-            strength_score += 1
-        if re.search(r'\d', password):
-            strength_score += 1
-        if re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
-            strength_score += 2
-        
-        # Determine strength level
-        if strength_score >= 7:
-            strength = "Very Strong"
-            color = "green"
-        elif strength_score >= 5:
-            strength = "Strong"
-            color = "blue"
-        elif strength_score >= 3:
-            strength = "Medium"
-            color = "orange"
+    def update_strength_indicator(self, password, bits=None):
+        """Calculate and display password strength
+
+        ``bits`` overrides the entropy estimate, as for passphrases, whose
+        strength comes from the number of words rather than characters.
+        """
+        if self.breached is not None and password in self.breached:
+            self.strength_label.config(text="Strength: Breached (on the breach list)",
+                                      foreground="red")
+            return
+        if bits is None:
+            # A generated password's entropy comes from the pool it was drawn from
+            pool_size = len(self.generator.pool) if self.generator else None
+            bits, strength, color = password_strength(password, pool_size)
         else:
-            strength = "Weak"
-            color = "red"
-        
-        self.strength_label.config(text=f"Strength: {strength} ({strength_score}/8)", 
+            strength, color = strength_level(bits)
+        self.strength_label.config(text=f"Strength: {strength} ({bits:.0f} bits)", 
                                   foreground=color)
     
     def copy_to_clipboard(self):
@@ -328,8 +1295,254 @@ class PasswordGeneratorGUI:
         self.strength_label.config(text="Strength: N/A", foreground="black")
 
 
-def main():
+def add_policy_arguments(parser):
+    """Add one command-line option per PasswordPolicy setting"""
+    defaults = PasswordPolicy()
+    parser.add_argument("--length", type=int, default=defaults.length)
+    for name in ("uppercase", "lowercase", "digits", "symbols"):
+        parser.add_argument(f"--no-{name}", dest=name, action="store_false",
+                            help=f"leave {name} out of the pool")
+    parser.add_argument("--exclude-ambiguous", action="store_true", help=f"exclude {AMBIGUOUS_CHARS}")
+    parser.add_argument("--exclude-similar", action="store_true", help=f"exclude {SIMILAR_CHARS}")
+    parser.add_argument("--exclude", dest="exclude_custom", default="", metavar="CHARS",
+                        help="exclude these characters")
+    for name in ("uppercase", "lowercase", "digits", "symbols"):
+        parser.add_argument(f"--min-{name}", type=int, default=getattr(defaults, f"min_{name}"))
+    parser.add_argument("--no-enforce-rules", dest="enforce_rules", action="store_false",
+                        help="ignore the minimum character requirements")
+
+
+def policy_from_args(args):
+    """Build the PasswordPolicy described by add_policy_arguments() options"""
+    return PasswordPolicy(**{f.name: getattr(args, f.name) for f in fields(PasswordPolicy)})
+
+
+def run_export(args):
+    policy = policy_from_args(args)
+    try:
+        policy.validate()
+    except ValueError as e:
+        sys.exit(str(e))
+    breached = BreachedPasswordFilter(args.breached) if args.breached else None
+    start = time.perf_counter()
+    if args.output == "-":
+        written = export_passwords(policy, args.count, sys.stdout, args.format,
+                                   args.strength, args.workers, not args.insecure, breached)
+        sys.stdout.flush()
+    else:
+        with open(args.output, "w", newline="", buffering=1024 * 1024) as file:
+            written = export_passwords(policy, args.count, file, args.format,
+                                       args.strength, args.workers, not args.insecure, breached)
+    elapsed = time.perf_counter() - start
+    # Report on stderr so stdout stays pure password data
+    print(f"Exported {written:,} passwords in {elapsed:.2f}s "
+          f"({written / elapsed:,.0f} passwords/s)", file=sys.stderr)
+
+
+def run_audit(args):
+    policy = policy_from_args(args)
+    breached = BreachedPasswordFilter(args.breached) if args.breached else None
+    start = time.perf_counter()
+    with open(args.path, encoding="utf-8", errors="replace") as file:
+        summary = audit_passwords((line.rstrip("\r\n") for line in file), policy, breached)
+    elapsed = time.perf_counter() - start
+    count = summary["count"]
+    print(f"Audited {count:,} passwords in {elapsed:.2f}s ({count / (elapsed or 1e-9):,.0f} passwords/s)")
+    print(f"Mean entropy {summary['mean_bits']:.1f} bits, weakest {summary['weakest_bits']:.1f} bits")
+    for strength, n in summary["levels"].items():
+        print(f"  {strength}: {n:,}")
+    for problem, n in sorted(summary["violations"].items(), key=lambda item: -item[1]):
+        print(f"  {problem}: {n:,}")
+
+
+def run_passphrase(args):
+    policy = policy_from_args(args)
+    try:
+        words = WordListIndex(args.wordlist)
+        generator = PassphraseGenerator(words, policy, args.words, args.separator,
+                                        not args.insecure)
+    except (OSError, ValueError) as e:
+        sys.exit(str(e))
+    passphrases = (p + "\n" for p in generator.generate(args.count))
+    if args.output == "-":
+        write_buffered(passphrases, sys.stdout)
+    else:
+        with open(args.output, "w", buffering=1024 * 1024) as file:
+            write_buffered(passphrases, file)
+    strength, _ = strength_level(generator.entropy)
+    print(f"{words.count:,} words; {generator.entropy:.1f} bits per passphrase ({strength})",
+          file=sys.stderr)
+
+
+def chi_square_p_value(statistic, dof):
+    """Upper-tail p-value of a chi-square statistic (Wilson-Hilferty approximation)"""
+    z = ((statistic / dof) ** (1 / 3) - (1 - 2 / (9 * dof))) / math.sqrt(2 / (9 * dof))
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def uniformity_test(generator, samples_per_password=100, max_outcomes=100_000):
+    """Chi-square test of ``generator`` against uniform over every valid password
+
+    Enumerates the policy's valid passwords (so the policy must be small),
+    draws ``samples_per_password`` times that many passwords and returns
+    (valid password count, invalid or missing passwords, chi-square
+    statistic, p-value).
+    """
+    from itertools import product
+
+    policy = generator.policy
+    if len(generator.pool) ** generator.length > max_outcomes * 100:
+        raise ValueError("Policy too large to enumerate; shrink the length or pool")
+    valid = {
+        ''.join(chars) for chars in product(generator.pool, repeat=generator.length)
+        if not policy_violations(''.join(chars), policy)
+    }
+    if not 1 < len(valid) <= max_outcomes:
+        raise ValueError(f"Policy allows {len(valid):,} passwords; need 2 to {max_outcomes:,}")
+
+    samples = samples_per_password * len(valid)
+    counts = dict.fromkeys(valid, 0)
+    invalid = set()
+    for password in generator.generate(samples):
+        if password in counts:
+            counts[password] += 1
+        else:
+            invalid.add(password)
+    missing = {password for password, n in counts.items() if n == 0}
+    statistic = sum((n - samples_per_password) ** 2 for n in counts.values()) / samples_per_password
+    return len(valid), invalid | missing, statistic, chi_square_p_value(statistic, len(valid) - 1)
+
+
+def run_uniformity_test(args):
+    policy = policy_from_args(args)
+    generators = [PasswordGenerator(policy)]
+    # Exercise both sampling paths, whichever one the policy would pick
+    for use_rejection in (True, False):
+        for generator_class in dict.fromkeys([ExactPasswordGenerator, _bulk_generator_class()]):
+            generator = generator_class(policy)
+            if use_rejection and generator.acceptance < 1e-3:
+                continue  # Too few valid candidates to test rejection in reasonable time
+            generator.use_rejection = use_rejection
+            generators.append(generator)
+
+    failed = False
+    for generator in generators:
+        start = time.perf_counter()
+        outcomes, problems, statistic, p_value = uniformity_test(generator, args.samples)
+        elapsed = time.perf_counter() - start
+        uniform = not problems and p_value >= args.alpha
+        name = type(generator).__name__
+        if isinstance(generator, ExactPasswordGenerator):
+            name += " (rejection)" if generator.use_rejection else " (counting)"
+        print(f"{name}: {outcomes:,} valid passwords, "
+              f"chi-square {statistic:,.1f} on {outcomes - 1:,} dof, p = {p_value:.3g}, "
+              f"{len(problems):,} invalid/missing in {elapsed:.2f}s -> "
+              f"{'uniform' if uniform else 'NOT uniform'}")
+        failed |= isinstance(generator, ExactPasswordGenerator) and not uniform
+    if failed:
+        sys.exit("Exact generation failed the uniformity test")
+
+
+def run_breach_index(args):
+    start = time.perf_counter()
+    breached = BreachedPasswordFilter.build(args.wordlist, args.output, args.false_positive_rate)
+    size = os.path.getsize(args.output)
+    print(f"Indexed {breached.entries:,} passwords into {args.output} "
+          f"({size / 1024 / 1024:,.1f} MiB, {breached.hash_count} hashes) "
+          f"in {time.perf_counter() - start:.2f}s")
+    breached.close()
+
+
+def main(argv=None):
     """Main function to run the application"""
+    parser = argparse.ArgumentParser(description="Advanced Password Generator")
+    parser.add_argument("--benchmark", type=int, metavar="N",
+                        help="generate N passwords with the default policy and report throughput")
+    parser.add_argument("--workers", type=int, default=0, metavar="W",
+                        help="also benchmark generation across W worker processes")
+    subparsers = parser.add_subparsers(dest="command")
+
+    export_parser = subparsers.add_parser(
+        "export", help="stream generated passwords to stdout or a file without the GUI"
+    )
+    export_parser.add_argument("count", type=int)
+    export_parser.add_argument("--output", "-o", default="-", help="output file (default: stdout)")
+    export_parser.add_argument("--format", choices=["text", "csv", "jsonl"], default="text")
+    export_parser.add_argument("--strength", action="store_true",
+                               help="add each password's entropy in bits")
+    export_parser.add_argument("--workers", type=int, default=1,
+                               help="worker processes (0: one per CPU)")
+    export_parser.add_argument("--insecure", action="store_true",
+                               help="use the Mersenne Twister instead of os.urandom")
+    export_parser.add_argument("--breached", metavar="FILTER",
+                               help="replace any password found in this breach filter")
+    add_policy_arguments(export_parser)
+    export_parser.set_defaults(func=run_export)
+
+    audit_parser = subparsers.add_parser(
+        "audit", help="score a file of passwords (one per line) and check them against a policy"
+    )
+    audit_parser.add_argument("path")
+    audit_parser.add_argument("--breached", metavar="FILTER",
+                              help="also count passwords found in this breach filter")
+    add_policy_arguments(audit_parser)
+    audit_parser.set_defaults(func=run_audit)
+
+    passphrase_parser = subparsers.add_parser(
+        "passphrase", help="generate diceware-style passphrases from a wordlist"
+    )
+    passphrase_parser.add_argument("count", type=int)
+    passphrase_parser.add_argument("--wordlist", default=PASSPHRASE_WORDLIST_FILE)
+    passphrase_parser.add_argument("--words", type=int, default=PASSPHRASE_WORDS)
+    passphrase_parser.add_argument("--separator", default=PASSPHRASE_SEPARATOR)
+    passphrase_parser.add_argument("--output", "-o", default="-", help="output file (default: stdout)")
+    passphrase_parser.add_argument("--insecure", action="store_true",
+                                   help="use the Mersenne Twister instead of os.urandom")
+    add_policy_arguments(passphrase_parser)
+    passphrase_parser.set_defaults(func=run_passphrase)
+
+    uniformity_parser = subparsers.add_parser(
+        "uniformity-test", help="check that generation is uniform over every valid password"
+    )
+    uniformity_parser.add_argument("--samples", type=int, default=200,
+                                   help="expected draws per valid password")
+    uniformity_parser.add_argument("--alpha", type=float, default=0.001,
+                                   help="reject uniformity below this p-value")
+    add_policy_arguments(uniformity_parser)
+    # A policy small enough to enumerate, with minimums that skew the legacy generator
+    uniformity_parser.set_defaults(
+        length=4, lowercase=False, symbols=False, min_digits=2, min_lowercase=0, min_symbols=0,
+        exclude_custom=string.ascii_uppercase[3:] + string.digits[3:],
+    )
+    uniformity_parser.set_defaults(func=run_uniformity_test)
+
+    index_parser = subparsers.add_parser(
+        "breach-index", help="compile a wordlist of breached passwords into a Bloom filter file"
+    )
+    index_parser.add_argument("wordlist")
+    index_parser.add_argument("--output", "-o", default=BREACH_FILTER_FILE)
+    index_parser.add_argument("--false-positive-rate", type=float, default=BREACH_FALSE_POSITIVE_RATE)
+    index_parser.set_defaults(func=run_breach_index)
+
+    args = parser.parse_args(argv)
+
+    if args.command is not None:
+        args.func(args)
+        return
+
+    if args.benchmark:
+        for generator_class in (PasswordGenerator, ExactPasswordGenerator, VectorizedPasswordGenerator):
+            for secure in (True, False):
+                rate = benchmark_generator(PasswordPolicy(), args.benchmark, secure, generator_class)
+                source = "os.urandom" if secure else "Mersenne Twister"
+                print(f"{generator_class.__name__}: {args.benchmark:,} passwords "
+                      f"at {rate:,.0f} passwords/s ({source})")
+        if args.workers:
+            for workers in sorted({1, args.workers}):
+                rate = benchmark_parallel(PasswordPolicy(), args.benchmark, workers)
+                print(f"{workers} worker(s): {args.benchmark:,} passwords at {rate:,.0f} passwords/s")
+        return
+
     root = tk.Tk()
     app = PasswordGeneratorGUI(root)
     root.mainloop()
@@ -0,0 +1,28 @@
+import importlib.util
+import pathlib
+import sys
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+
+def load_script(filename, module_name):
+    """Import one of the top-level scripts, whose file names contain spaces"""
+    if module_name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(module_name, ROOT / filename)
+        module = importlib.util.module_from_spec(spec)
+        # Registered so worker processes can unpickle references to its functions
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[module_name]
+
+
+@pytest.fixture(scope="session")
+def rpg():
+    return load_script("Random Password Generator.py", "random_password_generator")
+
+
+@pytest.fixture(scope="session")
+def bmi():
+    return load_script("BMI Calculator.py", "bmi_calculator")
@@ -0,0 +1,46 @@
+import queue
+import threading
+from types import SimpleNamespace
+
+
+def run_load_worker(bmi, load_series, cancel=None):
+    view = SimpleNamespace(load_series=load_series, _padded=bmi.HistoryView._padded)
+    results = queue.Queue()
+    bmi.HistoryView._load_worker(view, "alice", None, 4, cancel or threading.Event(), results)
+    return [results.get_nowait() for _ in range(results.qsize())]
+
+
+def test_load_worker_posts_the_series_before_its_envelope(bmi):
+    np = bmi.import_numpy()
+    dates = np.arange(100, dtype=float)
+    series = (dates, np.full(100, 22.0), np.full(100, 70.0))
+
+    messages = run_load_worker(bmi, lambda user, period: series)
+
+    assert [kind for kind, _ in messages] == ["series", "envelope"]
+    (x_min, x_max, buckets), points = messages[1][1]
+    assert buckets == 4 and len(points) == 2
+
+
+def test_load_worker_stops_once_cancelled(bmi):
+    np = bmi.import_numpy()
+    cancel = threading.Event()
+
+    def load_series(user, period):
+        cancel.set()  # Window closed while the store was being read
+        return np.arange(100, dtype=float), np.zeros(100), np.zeros(100)
+
+    assert run_load_worker(bmi, load_series, cancel) == []
+
+
+def test_downsample_keeps_in_range_extremes_next_to_an_off_screen_point(bmi):
+    np = bmi.import_numpy()
+    x = np.array([-0.1, 0.1, 0.2, 0.3, 0.4, 0.6, 0.7, 0.8, 0.9])
+    y = np.array([0.5, 3.0, 1.0, 4.0, 2.0, 3.0, 9.0, 2.0, 4.0])
+
+    xs, ys = bmi.downsample_minmax(x, y, 0.0, 1.0, buckets=2)
+
+    kept = set(zip(xs.tolist(), ys.tolist()))
+    assert (-0.1, 0.5) in kept   # Nearest point left of the range
+    assert (0.2, 1.0) in kept    # In-range minimum of the first bucket
+    assert (0.7, 9.0) in kept    # Maximum of the second bucket
@@ -0,0 +1,8 @@
+import pytest
+
+
+@pytest.mark.parametrize("backend", ["jsonl", "sqlite"])
+def test_concurrent_writers_lose_no_saves(bmi, backend):
+    elapsed, problems = bmi.stress_test(backend, writers=4, saves=200)
+    assert problems == {}
+    assert elapsed > 0
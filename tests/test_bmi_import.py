@@ -0,0 +1,24 @@
+def test_bulk_import_skips_malformed_records(bmi, tmp_path):
+    path = tmp_path / "readings.jsonl"
+    path.write_text(
+        '{"user": "alice", "date": "2024-01-01 08:00:00", "weight": 70, "height": 1.75}\n'
+        '{"user": "alice", "date": "2024-01-02 08:00:00", "weight": 71\n'
+        '{"user": "alice", "date": "2024-01-03 08:00:00", "weight": 72}\n'
+        '[1, 2, 3]\n'
+        '{"user": "alice", "date": "2024-01-04 08:00:00", "weight": 73, "height": 1.75}\n'
+    )
+    store = bmi.SQLiteStore(str(tmp_path / "bmi_data.db"), None)
+
+    imported, skipped = bmi.bulk_import(store, bmi.read_import_rows(str(path)), batch_size=2)
+
+    assert (imported, skipped) == (2, 3)
+    assert [e["weight"] for e in store.history("alice")] == [70.0, 73.0]
+    store.close()
+
+
+def test_bulk_import_skips_csv_rows_missing_a_column(bmi, tmp_path):
+    path = tmp_path / "readings.csv"
+    path.write_text("user,date,weight\nalice,2024-01-01 08:00:00,70\n")
+    store = bmi.SQLiteStore(str(tmp_path / "bmi_data.db"), None)
+    assert bmi.bulk_import(store, bmi.read_import_rows(str(path))) == (0, 1)
+    store.close()
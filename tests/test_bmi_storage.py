@@ -0,0 +1,207 @@
+import time
+
+import pytest
+
+
+def entry(weight, date="2024-01-01 08:00:00"):
+    return {"date": date, "weight": float(weight), "height": 1.75, "bmi": weight / 1.75 ** 2}
+
+
+class FlakyStore:
+    """In-memory backend whose first ``failures`` append_many calls raise"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.records = []
+
+    def append_many(self, records):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("database is locked")
+        self.records.extend(records)
+
+    def close(self):
+        pass
+
+
+def test_cached_store_retries_a_failed_flush(bmi):
+    backend = FlakyStore(failures=1)
+    store = bmi.CachedStore(backend, flush_interval=0.02, batch_size=1)
+    store.append("alice", entry(70))
+    store.append("alice", entry(71))
+
+    deadline = time.monotonic() + 5
+    while len(backend.records) < 2 and time.monotonic() < deadline:
+        time.sleep(0.02)
+
+    assert store._writer.is_alive()
+    assert [e["weight"] for _, e in backend.records] == [70.0, 71.0]
+    store.close()
+
+
+def test_cached_store_close_raises_if_the_final_flush_fails(bmi):
+    backend = FlakyStore(failures=10 ** 6)
+    store = bmi.CachedStore(backend, flush_interval=60)
+    store.append("alice", entry(70))
+    with pytest.raises(OSError):
+        store.close()
+
+
+def test_sqlite_first_run_imports_uncompacted_log(bmi, tmp_path):
+    snapshot, log = str(tmp_path / "bmi_data.json"), str(tmp_path / "bmi_data.jsonl")
+    legacy = bmi.JSONLinesStore(snapshot, log)
+    legacy.append_many(("alice", entry(70 + i)) for i in range(5))
+    assert not (tmp_path / "bmi_data.json").exists()  # Still only in the log
+
+    store = bmi.SQLiteStore(str(tmp_path / "bmi_data.db"), snapshot, log)
+    assert [e["weight"] for e in store.history("alice")] == [70.0, 71.0, 72.0, 73.0, 74.0]
+    store.close()
+
+
+def test_sharding_writes_the_index_once_per_migration(bmi, tmp_path, monkeypatch):
+    source = bmi.JSONLinesStore(str(tmp_path / "bmi_data.json"), str(tmp_path / "bmi_data.jsonl"))
+    source.append_many((f"user{u}", entry(60 + i)) for u in range(2000) for i in range(2))
+    expected = source.load_all()
+
+    writes = []
+    write_index = bmi.ShardedStore._write_index
+    monkeypatch.setattr(bmi.ShardedStore, "_write_index",
+                        lambda self: writes.append(self.directory) or write_index(self))
+
+    directory = str(tmp_path / "shards")
+    store = bmi.shard_monolithic_store(source, directory, shard_count=16)
+    assert len(writes) == 1
+    assert store.load_all() == expected
+
+    writes.clear()
+    store.rebalance(4)
+    assert len(writes) == 1
+    assert store.shard_count == 4
+    assert bmi.ShardedStore(directory).load_all() == expected
+
+
+def test_cached_history_arrays_fill_the_cache_for_row_backends(bmi, tmp_path):
+    backend = bmi.SQLiteStore(str(tmp_path / "bmi_data.db"), None)
+    backend.append_many(("alice", entry(70 + i)) for i in range(3))
+    store = bmi.CachedStore(backend, flush_interval=60)
+    reads = []
+    backend_history = backend.history
+    backend.history = lambda user: reads.append(user) or backend_history(user)
+
+    for _ in range(3):
+        _, weights, _, _ = store.history_arrays("alice")
+        assert list(weights) == [70.0, 71.0, 72.0]
+    assert reads == ["alice"]
+    store.close()
+
+
+def test_cached_store_stays_open_until_the_final_flush_succeeds(bmi):
+    backend = FlakyStore(failures=2)
+    store = bmi.CachedStore(backend, flush_interval=60)
+    store.append("alice", entry(70))
+    for _ in range(2):
+        with pytest.raises(OSError):
+            store.close()
+
+    store.close()  # Retried: the queued save is written, not dropped
+    assert [e["weight"] for _, e in backend.records] == [70.0]
+
+
+def test_cached_store_can_discard_unwritable_records(bmi):
+    backend = FlakyStore(failures=10 ** 6)
+    store = bmi.CachedStore(backend, flush_interval=60)
+    store.append("alice", entry(70))
+    with pytest.raises(OSError):
+        store.close()
+
+    assert store.discard_pending() == 1
+    store.close()
+    assert backend.records == []
+
+
+def test_sqlite_migration_rechecks_the_version_under_the_write_lock(bmi, tmp_path, monkeypatch):
+    snapshot, log = str(tmp_path / "bmi_data.json"), str(tmp_path / "bmi_data.jsonl")
+    bmi.JSONLinesStore(snapshot, log).append_many(("alice", entry(70 + i)) for i in range(3))
+    db = str(tmp_path / "bmi_data.db")
+    bmi.SQLiteStore(db, snapshot, log).close()
+
+    # A second process that read user_version just before the first migrated
+    stale = [0]
+    schema_version = bmi.SQLiteStore._schema_version
+    monkeypatch.setattr(bmi.SQLiteStore, "_schema_version",
+                        lambda self: stale.pop() if stale else schema_version(self))
+
+    store = bmi.SQLiteStore(db, snapshot, log)
+    assert not stale
+    assert [e["weight"] for e in store.history("alice")] == [70.0, 71.0, 72.0]
+    assert len(store.rollups("alice", "day")) == 1
+    store.close()
+
+
+def test_jsonl_compaction_interrupted_before_the_log_reset(bmi, tmp_path, monkeypatch):
+    snapshot, log = str(tmp_path / "bmi_data.json"), str(tmp_path / "bmi_data.jsonl")
+    store = bmi.JSONLinesStore(snapshot, log)
+    store.append_many(("alice", entry(70 + i)) for i in range(3))
+
+    replace = bmi.JSONLinesStore._replace
+
+    def crash_on_log(path, text):
+        if path == log:
+            raise KeyboardInterrupt  # Process killed after the snapshot was renamed
+        replace(path, text)
+
+    monkeypatch.setattr(bmi.JSONLinesStore, "_replace", staticmethod(crash_on_log))
+    with pytest.raises(KeyboardInterrupt):
+        store.compact()
+    monkeypatch.undo()
+
+    store.append("alice", entry(73))  # Still goes to the old log
+    assert [e["weight"] for e in store.history("alice")] == [70.0, 71.0, 72.0, 73.0]
+    store.compact()
+    assert [e["weight"] for e in store.history("alice")] == [70.0, 71.0, 72.0, 73.0]
+
+
+def test_jsonl_log_recreated_after_compaction_is_replayed(bmi, tmp_path):
+    snapshot, log = tmp_path / "bmi_data.json", tmp_path / "bmi_data.jsonl"
+    store = bmi.JSONLinesStore(str(snapshot), str(log))
+    store.append_many(("alice", entry(70 + i)) for i in range(3))
+    store.compact()
+    log.unlink()
+
+    store.append("alice", entry(73))
+    assert [e["weight"] for e in store.history("alice")] == [70.0, 71.0, 72.0, 73.0]
+
+
+# Sunday/Monday and month edges, a leap day, and a week spanning New Year
+BOUNDARY_DATES = [
+    "2023-12-31 23:59:59", "2024-01-01 00:00:00", "2024-01-07 12:00:00",
+    "2024-01-31 23:00:00", "2024-02-01 06:00:00", "2024-02-29 08:00:00",
+    "2024-03-01 08:00:00", "2024-03-03 21:00:00", "2024-03-04 07:00:00",
+    "2024-12-30 09:00:00", "2025-01-01 09:00:00", "2025-01-05 22:00:00",
+]
+
+
+@pytest.mark.parametrize("period", ["day", "week", "month"])
+def test_rollups_agree_across_sql_backfill_upserts_and_python(bmi, tmp_path, period):
+    entries = [entry(60 + i, date) for i, date in enumerate(BOUNDARY_DATES)]
+    expected = bmi.rollup_rows(bmi.compute_rollup_buckets(entries, period))
+
+    snapshot, log = str(tmp_path / "bmi_data.json"), str(tmp_path / "bmi_data.jsonl")
+    bmi.JSONLinesStore(snapshot, log).append_many(("alice", e) for e in entries)
+    backfilled = bmi.SQLiteStore(str(tmp_path / "backfill.db"), snapshot, log)
+
+    upserted = bmi.SQLiteStore(str(tmp_path / "upsert.db"), None)
+    upserted.append_many(("alice", e) for e in entries[:5])
+    for e in entries[5:]:
+        upserted.append("alice", e)
+
+    cached = bmi.CachedStore(bmi.SQLiteStore(str(tmp_path / "cached.db"), None), flush_interval=60)
+    cached.rollups("alice", period)  # Load the (empty) buckets so appends update them in memory
+    cached.append_many(("alice", e) for e in entries)
+
+    for store in (backfilled, upserted, cached):
+        rows = store.rollups("alice", period)
+        assert [row.pop("bucket") for row in rows] == [row["bucket"] for row in expected]
+        for row, want in zip(rows, expected):
+            assert row == pytest.approx({k: v for k, v in want.items() if k != "bucket"})
+        store.close()
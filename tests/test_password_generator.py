@@ -0,0 +1,74 @@
+import math
+import string
+
+import pytest
+
+
+def test_passphrase_tail_keeps_minimums_with_a_class_disabled(rpg, tmp_path):
+    wordlist = tmp_path / "words.txt"
+    wordlist.write_text("apple\nbanana\necho\ndelta\n")
+    policy = rpg.PasswordPolicy(uppercase=False, min_digits=2)
+    generator = rpg.PassphraseGenerator(rpg.WordListIndex(str(wordlist)), policy, word_count=4,
+                                        separator=" ")
+
+    for _ in range(50):
+        passphrase = generator.generate_one()
+        tail = passphrase.split(" ")[-1]
+        assert sum(c in string.digits for c in tail) == 2
+        assert sum(c in string.punctuation for c in tail) == 1
+        assert not any(c.isupper() for c in passphrase)
+
+
+def small_policy(rpg, **overrides):
+    """A policy small enough for uniformity_test() to enumerate (810 passwords)"""
+    settings = dict(length=4, lowercase=False, symbols=False, min_digits=2, min_lowercase=0,
+                    min_symbols=0, exclude_custom=string.ascii_uppercase[3:] + string.digits[3:])
+    settings.update(overrides)
+    return rpg.PasswordPolicy(**settings)
+
+
+@pytest.mark.parametrize("use_rejection", [True, False])
+@pytest.mark.parametrize("generator_name", ["ExactPasswordGenerator", "VectorizedPasswordGenerator"])
+def test_exact_generation_is_uniform(rpg, generator_name, use_rejection):
+    generator = getattr(rpg, generator_name)(small_policy(rpg))
+    generator.use_rejection = use_rejection
+    outcomes, problems, _, p_value = rpg.uniformity_test(generator, samples_per_password=100)
+    assert outcomes == 810
+    assert not problems
+    assert p_value > 1e-4
+
+
+def test_legacy_generation_is_skewed(rpg):
+    _, _, _, p_value = rpg.uniformity_test(rpg.PasswordGenerator(small_policy(rpg)), 100)
+    assert p_value < 1e-4
+
+
+def test_counting_path_handles_passwords_longer_than_256(rpg):
+    policy = rpg.PasswordPolicy(length=300, min_symbols=200)
+    generator = rpg.ExactPasswordGenerator(policy)
+    assert not generator.use_rejection
+    for password in generator.generate(5):
+        assert len(password) == 300
+        assert not rpg.policy_violations(password, policy)
+
+
+def test_length_is_capped(rpg):
+    with pytest.raises(ValueError):
+        rpg.PasswordPolicy(length=rpg.MAX_PASSWORD_LENGTH + 1).validate()
+
+
+def test_strength_cache_does_not_hold_passwords(rpg):
+    # Same length and classes score the same, without caching either password
+    assert rpg.password_strength("Tr0ub4dor&3") == rpg.password_strength("Xy9zzzzzz!1")
+    assert not hasattr(rpg.password_strength, "cache_info")
+
+
+def test_strength_cache_stays_bounded_with_non_ascii_passwords(rpg):
+    rpg._pool_size.cache_clear()
+    for i in range(500):
+        rpg.password_strength(f"pass{chr(0x4E00 + i)}{chr(0x5000 + i)}")
+
+    assert rpg._pool_size.cache_info().currsize == 1
+    # Each distinct non-ASCII character still counts once towards the pool
+    bits = rpg.password_strength("ab一一丁")[0]
+    assert bits == pytest.approx(5 * math.log2(26 + 2))